@@ -3,15 +3,14 @@
 # Requires: pip install google-genai
 # Set env var: GEMINI_API_KEY (your key from Google AI Studio)
 
-import os, json, re, sqlite3, time
-from google import genai   # pip install google-genai
+import os, sys, json, re, time, queue, threading
 import student_system
 
 DB_PATH = "app.db"
 MODEL = "gemini-2.5-flash"   # change if needed
 
 def get_conn():
-    return sqlite3.connect(DB_PATH)
+    return student_system._connect(DB_PATH)
 
 def init_db():
     """Create DB and questions table if not present."""
@@ -42,6 +41,28 @@ def build_prompt(category: str, n: int):
         "Do NOT include explanations or extra text. Output valid JSON only (no markdown)."
     )
 
+def build_multi_prompt(counts: dict):
+    """One prompt for several categories; `counts` maps category -> number of questions."""
+    wanted = "".join(f"  - {cat}: {k} questions\n" for cat, k in counts.items())
+    return (
+        f'You are an expert college instructor. Produce {sum(counts.values())} distinct multiple-choice questions '
+        "split across these categories:\n" + wanted + "\n"
+        "Return a single valid JSON array. Each item must be an object with keys:\n"
+        '  "category": one of ' + ", ".join(f'"{cat}"' for cat in counts) + ",\n"
+        '  "question": string,\n'
+        '  "options": array of 4 strings (order = [A,B,C,D]),\n'
+        '  "answer": one of "A","B","C","D"\n\n'
+        "Do NOT include explanations or extra text. Output valid JSON only (no markdown)."
+    )
+
+def genai_available():
+    """True if google-genai can be imported; checked without importing it."""
+    import importlib.util
+    try:
+        return importlib.util.find_spec("google.genai") is not None
+    except ModuleNotFoundError:   # no "google" package at all
+        return False
+
 def call_gemini(prompt: str, temperature: float = 0.2):
     """
     Call Google GenAI (Gemini) using google-genai SDK (v1.55.0 compatible).
@@ -51,6 +72,12 @@ def call_gemini(prompt: str, temperature: float = 0.2):
     if not api_key:
         raise RuntimeError("GEMINI_API_KEY not set in environment")
 
+    # imported here so importing this module (and the quiz) never loads the SDK
+    try:
+        from google import genai   # pip install google-genai
+    except ImportError as e:
+        raise RuntimeError("google-genai is not installed (pip install google-genai)") from e
+
     client = genai.Client(api_key=api_key)
 
     # Preferred call pattern for google-genai SDK: models.generate_content
@@ -226,6 +253,22 @@ def generate_questions_to_db(category: str, n: int = 5, preview: bool = False, s
     If preview=True, returns parsed questions list without inserting.
     Returns number of inserted questions when preview=False.
     """
+    if preview:
+        return generate_questions_with_counts(category, n, preview=True, sleep_after=0)
+    # keep compatibility by returning only the inserted count;
+    # use generate_questions_with_counts() for the full breakdown
+    return generate_questions_with_counts(category, n, sleep_after=sleep_after)["inserted"]
+
+
+def generate_questions_with_counts(category: str, n: int = 5, preview: bool = False, sleep_after: float = 0.5,
+                                   progress=None, llm=None, **pipeline_opts):
+    """
+    Same as generate_questions_to_db but returns a dict of counts:
+    {"parsed", "invalid", "inserted", "skipped", "failed", "errors", "stages"}.
+    progress(done, total) is called as items are handled.
+    llm(prompt) -> text replaces call_gemini (e.g. a fake model for testing).
+    Extra keyword arguments are passed to run_generation_pipeline().
+    """
     # make sure the questions table and columns exist (student_system helper)
     try:
         student_system.init_questions_table()
@@ -233,53 +276,332 @@ def generate_questions_to_db(category: str, n: int = 5, preview: bool = False, s
         # fallback: if student_system isn't available for some reason, ignore and proceed
         pass
 
-    prompt = build_prompt(category, n)
-    raw = call_gemini(prompt)
-    parsed = parse_json_from_text(raw)
-    if not isinstance(parsed, list):
-        raise RuntimeError("Gemini did not return a JSON array.")
-
-    # normalize and validate model output
-    normalized = []
-    for item in parsed:
-        q = item.get("question") or item.get("q") or ""
-        opts = item.get("options") or item.get("opts") or []
-        ans = (item.get("answer") or item.get("ans") or "").strip().upper()
-        if not q or not isinstance(opts, list) or len(opts) != 4 or ans not in ("A", "B", "C", "D"):
-            continue
-        normalized.append({"question": q.strip(), "options": opts, "answer": ans})
-
-    # preview mode: return parsed items without inserting
+    result = run_generation_pipeline({category: n}, llm=llm, preview=preview, progress=progress, **pipeline_opts)
     if preview:
-        return normalized
-
-    # insert using student_system helper (which does fuzzy duplicate check)
-    inserted = 0
-    skipped = 0
-    for it in normalized:
-        try:
-            ok = student_system.insert_question_with_dup_check(
-                category=category,
-                qtext=it["question"],
-                opts=it["options"],
-                answer=it["answer"],
-                source="gemini",
-                threshold=0.82
-            )
-            if ok:
-                inserted += 1
-            else:
-                skipped += 1
-        except Exception:
-            # if anything goes wrong with the helper, count as skipped
-            skipped += 1
+        return result["items"]
 
     # small pause to respect rate limits
     time.sleep(sleep_after)
+    return result["counts"]
+
+
+def generate_multi_category_to_db(categories: list, n: int = 5, preview: bool = False, sleep_after: float = 0.5,
+                                  progress=None, llm=None, **pipeline_opts):
+    """
+    Generate `n` questions for each of `categories` with shared prompts (see plan_prompts):
+    one round trip can refresh DSA, DBMS and PYTHON together. Returns the same counts dict
+    as generate_questions_with_counts, with a per-category breakdown in "by_category"
+    (items the model left untagged or tagged with another category are under "untagged").
+    """
+    try:
+        student_system.init_questions_table()
+    except Exception:
+        pass
+
+    requested = {cat.strip().upper(): n for cat in categories if cat.strip()}
+    result = run_generation_pipeline(requested, llm=llm, preview=preview, progress=progress, **pipeline_opts)
+    if preview:
+        return result["items"]
+
+    time.sleep(sleep_after)
+    return result["counts"]
+
+
+def normalize_item(item):
+    """Validate one parsed model item; returns {"question", "options", "answer"} or None."""
+    if not isinstance(item, dict):
+        return None
+    q = item.get("question") or item.get("q") or ""
+    opts = item.get("options") or item.get("opts") or []
+    ans = (item.get("answer") or item.get("ans") or "")
+    if not isinstance(q, str) or not isinstance(ans, str):
+        return None
+    ans = ans.strip().upper()
+    if not q.strip() or not isinstance(opts, list) or len(opts) != 4 or ans not in ("A", "B", "C", "D"):
+        return None
+    if not all(isinstance(o, str) and o.strip() for o in opts):
+        return None
+    return {"question": q.strip(), "options": opts, "answer": ans}
+
+
+# --- staged generation pipeline ---
+# generate -> parse -> validate -> dedupe -> write, each stage on its own thread(s) with a
+# bounded queue in between: while the model is producing the next batch, earlier batches
+# are already being parsed, checked and written. A full queue blocks the stage before it
+# (backpressure), so a slow stage never lets work pile up in memory.
+
+_DONE = object()   # end-of-stream marker passed down the queues
+UNTAGGED = "untagged"   # by_category key for multi-category items without a requested category tag
+
+
+class _Stage:
+    """Runs fn(item) -> iterable of outputs on `workers` threads between two queues and keeps stats."""
+
+    def __init__(self, name, fn, inq, outq=None, workers=1, finish=None):
+        self.name, self.fn, self.inq, self.outq, self.finish = name, fn, inq, outq, finish
+        self.items_in = self.items_out = 0
+        self.busy = self.blocked = 0.0   # seconds working / seconds waiting on a full output queue
+        self.max_depth = 0
+        self.errors = []
+        self._lock = threading.Lock()
+        self._alive = workers
+        self.threads = [threading.Thread(target=self._run, name=f"pipeline-{name}-{i + 1}", daemon=True)
+                        for i in range(workers)]
+
+    def start(self):
+        for t in self.threads:
+            t.start()
+
+    def _emit(self, outputs):
+        for out in outputs:
+            with self._lock:
+                self.items_out += 1
+            if self.outq is not None:
+                t0 = time.perf_counter()
+                self.outq.put(out)
+                with self._lock:
+                    self.blocked += time.perf_counter() - t0
+
+    def _run(self):
+        while True:
+            depth = self.inq.qsize()
+            item = self.inq.get()
+            if item is _DONE:
+                self.inq.put(_DONE)   # let sibling workers see it too
+                break
+            with self._lock:
+                self.items_in += 1
+                self.max_depth = max(self.max_depth, depth)
+            t0 = time.perf_counter()
+            try:
+                outputs = list(self.fn(item) or ())
+            except Exception as e:
+                outputs = []
+                with self._lock:
+                    self.errors.append(e)
+            with self._lock:
+                self.busy += time.perf_counter() - t0
+            self._emit(outputs)
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last:
+            if self.finish:
+                t0 = time.perf_counter()
+                try:
+                    outputs = list(self.finish() or ())
+                except Exception as e:
+                    outputs = []
+                    with self._lock:
+                        self.errors.append(e)
+                with self._lock:
+                    self.busy += time.perf_counter() - t0
+                self._emit(outputs)
+            if self.outq is not None:
+                self.outq.put(_DONE)
+
+    def stats(self, wall):
+        return {
+            "stage": self.name,
+            "workers": len(self.threads),
+            "in": self.items_in,
+            "out": self.items_out,
+            "busy_s": round(self.busy, 4),
+            "blocked_s": round(self.blocked, 4),
+            "items_per_s": round(self.items_in / self.busy, 1) if self.busy else None,
+            "utilization": round(self.busy / (wall * len(self.threads)), 2) if wall else None,
+            "max_queue_depth": self.max_depth,
+            "errors": len(self.errors),
+        }
+
+
+def plan_prompts(requested: dict, batch_size: int = 10):
+    """
+    Split {category: n} into prompts of at most `batch_size` questions each.
+    Categories are interleaved so every prompt gets a balanced share, e.g.
+    {"DSA": 5, "DBMS": 5, "PYTHON": 5} with batch_size 10 -> [{DSA: 4, DBMS: 3, PYTHON: 3}, {DSA: 1, DBMS: 2, PYTHON: 2}].
+    """
+    order = []
+    left = dict(requested)
+    while any(v > 0 for v in left.values()):
+        for cat in requested:
+            if left[cat] > 0:
+                order.append(cat)
+                left[cat] -= 1
+    prompts = []
+    for i in range(0, len(order), batch_size):
+        spec = {}
+        for cat in order[i:i + batch_size]:
+            spec[cat] = spec.get(cat, 0) + 1
+        prompts.append(spec)
+    return prompts
+
+
+def run_generation_pipeline(requested: dict, llm=None, preview: bool = False, progress=None,
+                            batch_size: int = 10, generate_workers: int = 2, queue_size: int = 8,
+                            write_batch: int = 25, threshold: float = 0.82, db_path: str = None):
+    """
+    Generate questions for `requested` ({category: n}) in prompts of up to `batch_size`
+    and push them through the staged pipeline. A prompt covering several categories uses
+    build_multi_prompt() and items are routed by their "category" tag.
+    Returns {"counts": {...}, "stages": [...], "items": [...]}
+    ("items" holds the accepted questions only when preview=True, and nothing is written).
+    counts["errors"] lists "stage: message" for every prompt or write batch that failed
+    (items of a failed write are counted as "failed"); if nothing parsed at all, the first
+    error is raised instead.
+    """
+    llm = llm or call_gemini
+    db_path = db_path or student_system.DEFAULT_DB_PATH
+    n = sum(requested.values())
+    counts = {"parsed": 0, "invalid": 0, "inserted": 0, "skipped": 0, "failed": 0,
+              "by_category": {cat: {"inserted": 0, "skipped": 0, "invalid": 0, "failed": 0} for cat in requested}}
+    lock = threading.Lock()
+    last_report = [0.0]
+
+    def report(force=False):
+        # throttled: progress() may write to the DB (generation_jobs)
+        if progress and (force or time.perf_counter() - last_report[0] >= 0.5):
+            last_report[0] = time.perf_counter()
+            with lock:
+                done = counts["invalid"] + counts["inserted"] + counts["skipped"] + counts["failed"]
+                total = max(n, counts["parsed"])
+            try:
+                progress(done, total)
+            except Exception as e:
+                # progress is only a report: a failed update must not lose counts or committed writes
+                print("Progress update failed:", e, file=sys.stderr)
+
+    def bump(key, k=1, category=None):
+        with lock:
+            counts[key] += k
+            if category is not None:
+                per_cat = counts["by_category"].setdefault(
+                    category, {"inserted": 0, "skipped": 0, "invalid": 0, "failed": 0})
+                per_cat[key] += k
+        report()
+
+    def generate(spec):
+        if len(spec) == 1:
+            (cat, k), = spec.items()
+            return [(spec, llm(build_prompt(cat, k)))]
+        return [(spec, llm(build_multi_prompt(spec)))]
+
+    def parse(job):
+        spec, raw = job
+        parsed = parse_json_from_text(raw)
+        if not isinstance(parsed, list):
+            raise RuntimeError("Gemini did not return a JSON array.")
+        bump("parsed", len(parsed))
+        return [(spec, item) for item in parsed]
+
+    def validate(job):
+        spec, item = job
+        # route: single-category prompts don't need a tag, multi-category ones must have a requested one
+        if len(spec) == 1:
+            category = next(iter(spec))
+        else:
+            tag = item.get("category") if isinstance(item, dict) else None
+            category = tag.strip().upper() if isinstance(tag, str) else None
+            if category not in spec:
+                bump("invalid", category=UNTAGGED)   # keeps the by_category totals adding up
+                return []
+        it = normalize_item(item)
+        if it is None:
+            bump("invalid", category=category)
+            return []
+        it["category"] = category
+        return [it]
+
+    seen = {}   # category -> normalized texts: existing questions + accepted this run
+    checked_to = {}   # category -> id its questions were compared up to; later ones are re-checked at write
+
+    def dedupe(it):
+        if not seen:
+            # one pass over the DB for every requested category, on the dedupe thread
+            checked_to.update(dict.fromkeys(requested, student_system.max_question_id(db_path)))
+            seen.update(student_system.load_normalized_questions_by_category(list(requested), db_path))
+        q_norm = student_system._normalize_text(it["question"])
+        if student_system.similar_in(q_norm, seen[it["category"]], threshold):
+            bump("skipped", category=it["category"])
+            return []
+        seen[it["category"]].append(q_norm)
+        return [it]
+
+    accepted = []
+    pending = []
+
+    def write(it):
+        if preview:
+            accepted.append(it)
+            return []
+        pending.append(it)
+        if len(pending) >= write_batch:
+            return flush()
+        return []
+
+    def flush():
+        if pending:
+            by_cat = {}
+            for it in pending:
+                by_cat.setdefault(it["category"], []).append(it)
+            pending.clear()
+            for cat, items in by_cat.items():
+                try:
+                    # re-check inside the write lock: another job may have added the same question
+                    written, checked_to[cat] = student_system.insert_questions_rechecked(
+                        cat, items, checked_to[cat], source="gemini", threshold=threshold, db_path=db_path)
+                except Exception:
+                    bump("failed", len(items), category=cat)
+                    raise   # recorded as a write-stage error
+                bump("inserted", written, category=cat)
+                bump("skipped", len(items) - written, category=cat)
+        return []
+
+    queues = [queue.Queue()] + [queue.Queue(maxsize=queue_size) for _ in range(4)]
+    stages = [
+        _Stage("generate", generate, queues[0], queues[1], workers=generate_workers),
+        _Stage("parse", parse, queues[1], queues[2]),
+        _Stage("validate", validate, queues[2], queues[3]),
+        _Stage("dedupe", dedupe, queues[3], queues[4]),   # single thread: owns `seen`
+        _Stage("write", write, queues[4], None, finish=flush),
+    ]
+
+    for spec in plan_prompts(requested, batch_size):
+        queues[0].put(spec)
+    queues[0].put(_DONE)
+
+    t0 = time.perf_counter()
+    for st in stages:
+        st.start()
+    for st in stages:
+        for t in st.threads:
+            t.join()
+    wall = time.perf_counter() - t0
+
+    report(force=True)
+    # nothing came back at all (e.g. no API key): surface the error like the old single call did
+    errors = [(st.name, e) for st in stages for e in st.errors]
+    if errors and counts["parsed"] == 0:
+        raise errors[0][1]
+
+    stage_stats = [st.stats(wall) for st in stages]
+    counts["errors"] = [f"{name}: {e}" for name, e in errors]
+    counts["stages"] = stage_stats
+    counts["wall_s"] = round(wall, 4)
+    return {"counts": counts, "stages": stage_stats, "items": accepted}
+
 
-    # you can return a tuple if you want both counts, but keep compatibility by returning inserted
-    # return inserted, skipped
-    return inserted
+def format_pipeline_stats(counts):
+    """Readable table of per-stage stats from generate_questions_with_counts()."""
+    lines = [f"{'stage':<9} {'in':>5} {'out':>5} {'busy s':>8} {'blocked s':>9} {'items/s':>9} {'util':>5} {'max q':>5}"]
+    for st in counts.get("stages", []):
+        rate = "-" if st["items_per_s"] is None else f"{st['items_per_s']:.1f}"
+        lines.append(f"{st['stage']:<9} {st['in']:>5} {st['out']:>5} {st['busy_s']:>8.3f} {st['blocked_s']:>9.3f} "
+                     f"{rate:>9} {st['utilization'] or 0:>5.2f} {st['max_queue_depth']:>5}")
+    if counts.get("stages"):
+        slowest = max(counts["stages"], key=lambda s: s["busy_s"] / s["workers"])
+        lines.append(f"Bottleneck: {slowest['stage']} (total {counts.get('wall_s', 0):.2f} s)")
+    return "\n".join(lines)
 
 # CLI quick-run
 if __name__ == "__main__":
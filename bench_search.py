@@ -0,0 +1,62 @@
+# Query latency benchmark for student_system.search_questions (FTS5 index).
+# Fills a temporary app.db with synthetic questions, then times a few searches.
+# Usage: python bench_search.py [rows] (default 1000000)
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+import student_system
+
+WORDS = ("array stack queue heap tree graph hash sort search pointer recursion "
+         "index join table key transaction lock schema query view trigger "
+         "list tuple dict set class lambda generator decorator module exception").split()
+TOPICS = ["B-tree", "normalization", "binary search", "deadlock", "list comprehension"]
+
+
+def fill(db_path, rows, seed=7):
+    rng = random.Random(seed)
+    cats = ("DSA", "DBMS", "PYTHON")
+    student_system.init_questions_table(db_path)
+    conn = student_system._connect(db_path)
+    batch = []
+    for i in range(rows):
+        words = rng.sample(WORDS, 8)
+        if i % 1000 == 0:
+            words.append(TOPICS[(i // 1000) % len(TOPICS)])
+        batch.append((cats[i % 3], "Which " + " ".join(words) + "?", *rng.sample(WORDS, 4), "ABCD"[i % 4]))
+        if len(batch) == 10000:
+            conn.executemany("INSERT INTO questions (category, qtext, opt_a, opt_b, opt_c, opt_d, answer) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            batch = []
+    if batch:
+        conn.executemany("INSERT INTO questions (category, qtext, opt_a, opt_b, opt_c, opt_d, answer) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "app.db")
+        t0 = time.perf_counter()
+        fill(db_path, rows)
+        print(f"Inserted {rows} rows (FTS kept in sync by triggers) in {time.perf_counter() - t0:.1f} s")
+
+        queries = [(t, None, 0) for t in TOPICS] + [("B-tree", "DSA", 0), ("heap sort", None, 0),
+                                                     ("heap sort", None, 200), ("decor*", "PYTHON", 0)]
+        print(f"{'query':<22} {'category':<8} {'offset':>6} {'hits':>5} {'ms':>8}")
+        for q, cat, offset in queries:
+            times = []
+            for _ in range(5):
+                t0 = time.perf_counter()
+                hits = student_system.search_questions(q, cat, limit=20, offset=offset, db_path=db_path)
+                times.append((time.perf_counter() - t0) * 1000)
+            print(f"{q:<22} {cat or '-':<8} {offset:>6} {len(hits):>5} {min(times):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Throughput benchmark for quiz_server.py.
+# Builds a synthetic question bank in a temp directory, then runs the same number of
+# login, quiz-start and answer-submit requests with 1, 2, 4 ... workers and prints req/s
+# and the speedup over one worker. Submit throughput is measured until every score is
+# written by the coordinator; "graded s" is the part spent grading in the workers.
+# Each worker count gets its own fresh folder, its own students and a warmed-up app.db,
+# so every run does the same work (first attempts only) and none pays setup the others skip.
+# Usage: python bench_server.py [requests] [max_workers]
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+import leaderboard
+import quiz_server
+
+
+def write_bank(folder, per_category=2000):
+    files = {}
+    for cat in ("DSA", "DBMS", "PYTHON"):
+        path = os.path.join(folder, f"questions_{cat.lower()}.txt")
+        with open(path, "w") as f:
+            for i in range(per_category):
+                f.write(f"Q{i}. Sample {cat} question number {i}?\n")
+                f.write("A. first\nB. second\nC. third\nD. fourth\n")
+                f.write(f"ANSWER: {'ABCD'[i % 4]}\n\n")
+        files[cat] = path
+    return files
+
+
+def write_students(requests, prefix):
+    with open("students.txt", "w") as f:
+        for i in range(requests):
+            f.write(f"Student {i},{prefix}{i},pw{i},LNCTS,0157CS{i:05d},B.Tech,{prefix}{i}@example.com,"
+                    f"9000000000,01-01-2005,Female,,user\n")
+
+
+def run(workers, files, requests, folder):
+    rng = random.Random(42)
+    cats = list(files)
+    prefix = f"w{workers}_"
+    os.makedirs(folder)
+    os.chdir(folder)   # scores.txt, students.txt and app.db for this run only
+    write_students(requests, prefix)
+    leaderboard.init_leaderboard()   # one-time app.db setup, outside the timed phases
+    server = quiz_server.start_server(workers, files)
+    pool = server["pool"]
+    chunk = max(1, requests // (workers * 8))
+
+    logins = [("login", f"{prefix}{i}", f"pw{i}") for i in range(requests)]
+    t0 = time.perf_counter()
+    tokens = pool.map(quiz_server.handle_request, logins, chunksize=chunk)
+    t_login = time.perf_counter() - t0
+
+    starts = [("start", token, cats[i % len(cats)], 5, i) for i, token in enumerate(tokens)]
+    t0 = time.perf_counter()
+    sessions = pool.map(quiz_server.handle_request, starts, chunksize=chunk)
+    t_start = time.perf_counter() - t0
+
+    submits = []
+    for started in sessions:
+        submits.append(("submit", started["session"], [(i, rng.choice("ABCD")) for i, _ in started["questions"]]))
+    # a submit only counts once its score is written, so the clock runs until the coordinator catches up
+    t0 = time.perf_counter()
+    pool.map(quiz_server.handle_request, submits, chunksize=chunk)
+    t_graded = time.perf_counter() - t0
+    quiz_server.wait_for_writes(server, requests)
+    t_submit = time.perf_counter() - t0
+
+    quiz_server.stop_server(server)
+    return requests / t_login, requests / t_start, requests / t_submit, t_graded
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    old_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            files = write_bank(tmp)
+            counts = []
+            w = 1
+            while w <= max_workers:
+                counts.append(w)
+                w *= 2
+            if counts[-1] != max_workers:
+                counts.append(max_workers)
+
+            print(f"{requests} requests per phase, cores available: {os.cpu_count()}")
+            print(f"{'workers':>7} {'login req/s':>12} {'x':>6} {'start req/s':>12} {'x':>6} "
+                  f"{'submit req/s':>13} {'x':>6} {'graded s':>8}")
+            base = None
+            for w in counts:
+                rates = run(w, files, requests, os.path.join(tmp, f"run{w}"))
+                if base is None:
+                    base = rates
+                l, s, u = rates[:3]
+                print(f"{w:>7} {l:>12.0f} {l / base[0]:>6.2f} {s:>12.0f} {s / base[1]:>6.2f} "
+                      f"{u:>13.0f} {u / base[2]:>6.2f} {rates[3]:>8.2f}")
+        finally:
+            os.chdir(old_cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Startup benchmark based on `python -X importtime`.
+# Imports a module in a fresh interpreter, prints the slowest imports and the total,
+# and fails if the module pulls in anything from the lazy-loaded list or goes over budget.
+# Usage: python bench_startup.py [module] [budget_ms]
+
+import sys
+import subprocess
+
+# must never be loaded just by starting the student-facing quiz
+LAZY_MODULES = ("google.genai", "sqlite3", "difflib", "multiprocessing")
+
+
+def import_times(module):
+    """Return a list of (module_name, self_us, cumulative_us) for `import module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cum_us)))
+    return rows
+
+
+def main():
+    module = sys.argv[1] if len(sys.argv) > 1 else "quiz"
+    budget_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50.0
+
+    # best of a few runs to smooth out disk cache noise
+    runs = [import_times(module) for _ in range(5)]
+    rows = min(runs, key=lambda r: sum(x[1] for x in r))
+    total_ms = sum(r[1] for r in rows) / 1000
+    own = next((r for r in rows if r[0] == module), None)
+
+    print(f"import {module}: {total_ms:.1f} ms total, {len(rows)} modules")
+    if own:
+        print(f"  {module} itself (cumulative): {own[2] / 1000:.1f} ms")
+    print("  slowest (cumulative):")
+    for name, _, cum in sorted(rows, key=lambda r: -r[2])[:10]:
+        print(f"    {cum / 1000:8.2f} ms  {name}")
+
+    loaded = {r[0] for r in rows}
+    bad = [m for m in LAZY_MODULES if m in loaded]
+    ok = True
+    if bad:
+        print("FAIL: loaded at startup:", ", ".join(bad))
+        ok = False
+    if total_ms > budget_ms:
+        print(f"FAIL: over budget ({total_ms:.1f} ms > {budget_ms:.1f} ms)")
+        ok = False
+    if ok:
+        print(f"OK: within {budget_ms:.1f} ms budget, no lazy modules loaded.")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
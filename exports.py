@@ -0,0 +1,36 @@
+# Streaming CSV / JSONL export for the admin panel.
+# Rows are written as they come from a generator, so exporting millions of
+# questions or scores never holds more than one page in memory.
+
+import csv
+import json
+
+QUESTION_FIELDS = ["id", "category", "question", "opt_a", "opt_b", "opt_c", "opt_d", "answer", "source", "created_at"]
+USER_FIELDS = ["username", "full_name", "college", "enrollment_no", "course", "email",
+               "phone", "dob", "gender", "guardian_name", "role"]   # password is never exported
+SCORE_FIELDS = ["username", "category", "score", "date"]
+
+
+def export_rows(rows, fields, path, fmt="csv"):
+    """Write an iterable of tuples to `path` as csv or jsonl. Returns the number of rows written."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(fields)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        elif fmt == "jsonl":
+            for row in rows:
+                f.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n")
+                count += 1
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+    return count
+
+
+def user_rows(users):
+    """Turn (username, data) pairs into USER_FIELDS tuples."""
+    for username, d in users:
+        yield (username,) + tuple(d[k] for k in USER_FIELDS[1:])
@@ -0,0 +1,267 @@
+# Background queue for AI question generation (stored in app.db, table generation_jobs).
+# Admins enqueue "generate N for CATEGORY" (or "DSA,DBMS,...", N each) and get a job id back straight away;
+# worker threads (inside the quiz process or a separate `python generation_jobs.py`)
+# pick jobs up and record progress, counts, latency and errors as they go.
+# A running job is leased to one worker (owner + lease_until) and the worker renews the
+# lease while it works; only jobs whose lease ran out (worker died or was closed) are
+# picked up again, so a job is never run by two live workers at once.
+
+import os
+import sys
+import time
+import socket
+import datetime
+import threading
+
+import student_system
+
+DEFAULT_DB_PATH = student_system.DEFAULT_DB_PATH
+
+JOB_COLUMNS = ("id", "category", "n", "status", "done", "total", "parsed", "invalid",
+               "inserted", "skipped", "latency_ms", "error", "created_at", "started_at", "finished_at",
+               "owner", "lease_until")
+LEASE_SECONDS = 60   # a worker that stops renewing for this long loses the job
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def init_jobs_table(db_path: str = DEFAULT_DB_PATH):
+    conn = student_system._connect(db_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS generation_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT,
+            n INTEGER,
+            status TEXT DEFAULT 'queued',
+            done INTEGER DEFAULT 0,
+            total INTEGER DEFAULT 0,
+            parsed INTEGER DEFAULT 0,
+            invalid INTEGER DEFAULT 0,
+            inserted INTEGER DEFAULT 0,
+            skipped INTEGER DEFAULT 0,
+            latency_ms INTEGER,
+            error TEXT,
+            created_at TEXT,
+            started_at TEXT,
+            finished_at TEXT
+        )
+    """)
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(generation_jobs)").fetchall()]
+    if "owner" not in cols:
+        conn.execute("ALTER TABLE generation_jobs ADD COLUMN owner TEXT")
+    if "lease_until" not in cols:
+        conn.execute("ALTER TABLE generation_jobs ADD COLUMN lease_until REAL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_generation_jobs_status ON generation_jobs (status, id)")
+    conn.commit()
+    conn.close()
+
+
+def enqueue_job(category: str, n: int = 5, db_path: str = DEFAULT_DB_PATH) -> int:
+    """Add a job to the queue and return its id."""
+    init_jobs_table(db_path)
+    conn = student_system._connect(db_path)
+    cur = conn.cursor()
+    cur.execute("INSERT INTO generation_jobs (category, n, status, created_at) VALUES (?, ?, 'queued', ?)",
+                (category, n, _now()))
+    conn.commit()
+    job_id = cur.lastrowid
+    conn.close()
+    return job_id
+
+
+def _row_to_job(row):
+    return dict(zip(JOB_COLUMNS, row)) if row else None
+
+
+def get_job(job_id: int, db_path: str = DEFAULT_DB_PATH):
+    init_jobs_table(db_path)
+    conn = student_system._connect(db_path)
+    row = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM generation_jobs WHERE id = ?", (job_id,)).fetchone()
+    conn.close()
+    return _row_to_job(row)
+
+
+def list_jobs(limit: int = 20, db_path: str = DEFAULT_DB_PATH):
+    init_jobs_table(db_path)
+    conn = student_system._connect(db_path)
+    rows = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM generation_jobs ORDER BY id DESC LIMIT ?",
+                        (limit,)).fetchall()
+    conn.close()
+    return [_row_to_job(r) for r in rows]
+
+
+def worker_id():
+    """Identifies the worker thread that owns a lease (host, process, thread)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def claim_next_job(db_path: str = DEFAULT_DB_PATH, owner: str = None, lease_seconds: float = LEASE_SECONDS):
+    """
+    Lease the oldest queued job (or running job whose lease expired) to `owner` and return it,
+    or None if there is nothing to do. The guarded UPDATE makes this safe across workers/processes.
+    """
+    owner = owner or worker_id()
+    conn = student_system._connect(db_path)
+    try:
+        while True:
+            now = time.time()
+            row = conn.execute("SELECT id, status, owner FROM generation_jobs "
+                               "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                               "ORDER BY id LIMIT 1", (now,)).fetchone()
+            if not row:
+                return None
+            cur = conn.execute("UPDATE generation_jobs SET status = 'running', started_at = ?, done = 0, "
+                               "owner = ?, lease_until = ? "
+                               "WHERE id = ? AND status = ? AND owner IS ?",
+                               (_now(), owner, now + lease_seconds, row[0], row[1], row[2]))
+            conn.commit()
+            if cur.rowcount == 1:
+                break
+            # another worker claimed it first; try the next one
+        return _row_to_job(conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM generation_jobs WHERE id = ?",
+                                        (row[0],)).fetchone())
+    finally:
+        conn.close()
+
+
+def renew_lease(job_id: int, owner: str, db_path: str = DEFAULT_DB_PATH,
+                lease_seconds: float = LEASE_SECONDS) -> bool:
+    """Extend `owner`'s lease on a running job. False means the lease was lost to another worker."""
+    conn = student_system._connect(db_path)
+    cur = conn.execute("UPDATE generation_jobs SET lease_until = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                       (time.time() + lease_seconds, job_id, owner))
+    conn.commit()
+    conn.close()
+    return cur.rowcount == 1
+
+
+def _update_job(job_id: int, db_path: str, owner: str = None, **fields):
+    # with an owner, only touch the job while that worker still holds it
+    conn = student_system._connect(db_path)
+    sets = ", ".join(f"{k} = ?" for k in fields)
+    if owner is None:
+        conn.execute(f"UPDATE generation_jobs SET {sets} WHERE id = ?", (*fields.values(), job_id))
+    else:
+        conn.execute(f"UPDATE generation_jobs SET {sets} WHERE id = ? AND owner = ?", (*fields.values(), job_id, owner))
+    conn.commit()
+    conn.close()
+
+
+def requeue_stale_jobs(db_path: str = DEFAULT_DB_PATH) -> int:
+    """
+    Put running jobs whose lease has expired (their worker stopped) back in the queue.
+    Jobs a live worker is still renewing are left alone. Returns how many were requeued.
+    """
+    init_jobs_table(db_path)
+    conn = student_system._connect(db_path)
+    cur = conn.execute("UPDATE generation_jobs SET status = 'queued', done = 0, owner = NULL, lease_until = NULL "
+                       "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+    return cur.rowcount
+
+
+def run_job(job, db_path: str = DEFAULT_DB_PATH, llm=None, lease_seconds: float = LEASE_SECONDS):
+    """Run one claimed job and store its outcome. Never raises; failures are recorded on the job."""
+    t0 = time.perf_counter()
+    owner = job["owner"]
+
+    # renew the lease in the background: a single Gemini call can outlast any progress update
+    finished = threading.Event()
+
+    def heartbeat():
+        while not finished.wait(lease_seconds / 3):
+            try:
+                renew_lease(job["id"], owner, db_path, lease_seconds)
+            except Exception as e:
+                # e.g. "database is locked" during a write batch: keep trying while the lease lasts
+                print(f"Generation job #{job['id']}: lease renewal failed: {e}", file=sys.stderr)
+
+    threading.Thread(target=heartbeat, name=f"lease-{job['id']}", daemon=True).start()
+
+    def progress(done, total):
+        _update_job(job["id"], db_path, owner, done=done, total=total)
+
+    try:
+        # lazy import so the LLM SDK is only needed by whoever runs the workers
+        from ai_questions_gemini_db import generate_questions_with_counts, generate_multi_category_to_db
+        if "," in job["category"]:
+            # "DSA,DBMS,PYTHON": n per category, sharing prompts
+            counts = generate_multi_category_to_db(job["category"].split(","), job["n"], sleep_after=0,
+                                                   progress=progress, llm=llm)
+        else:
+            counts = generate_questions_with_counts(job["category"], job["n"], sleep_after=0,
+                                                    progress=progress, llm=llm)
+        # partial results still count, but a prompt or batch that errored fails the job
+        errors = counts.get("errors") or []
+        _update_job(job["id"], db_path, owner, status="failed" if errors else "done",
+                    error="; ".join(errors) or None, parsed=counts["parsed"], invalid=counts["invalid"],
+                    inserted=counts["inserted"], skipped=counts["skipped"], lease_until=None,
+                    latency_ms=int((time.perf_counter() - t0) * 1000), finished_at=_now())
+    except Exception as e:
+        _update_job(job["id"], db_path, owner, status="failed", error=str(e), lease_until=None,
+                    latency_ms=int((time.perf_counter() - t0) * 1000), finished_at=_now())
+    finally:
+        finished.set()
+
+
+def worker_loop(stop_event, db_path: str = DEFAULT_DB_PATH, poll_interval: float = 1.0, llm=None,
+                lease_seconds: float = LEASE_SECONDS):
+    owner = worker_id()
+    while not stop_event.is_set():
+        # a DB error must not end the thread: nothing would restart it and jobs would stay queued
+        try:
+            job = claim_next_job(db_path, owner, lease_seconds)
+            if job is not None:
+                run_job(job, db_path, llm=llm, lease_seconds=lease_seconds)
+                continue
+        except Exception as e:
+            print(f"Generation worker error: {e}", file=sys.stderr)
+        stop_event.wait(poll_interval)
+
+
+def start_workers(count: int = 2, db_path: str = DEFAULT_DB_PATH, poll_interval: float = 1.0, llm=None,
+                  lease_seconds: float = LEASE_SECONDS):
+    """
+    Requeue jobs with expired leases, then start `count` daemon worker threads.
+    Returns the stop event; call .set() on it to stop them.
+    Gemini calls are network-bound, so threads are enough to run several jobs at once.
+    """
+    stale = requeue_stale_jobs(db_path)
+    if stale:
+        print(f"Re-queued {stale} unfinished generation job(s).")
+    stop_event = threading.Event()
+    for i in range(count):
+        t = threading.Thread(target=worker_loop, args=(stop_event, db_path, poll_interval, llm, lease_seconds),
+                             name=f"generation-worker-{i + 1}", daemon=True)
+        t.start()
+    return stop_event
+
+
+def format_job(job):
+    line = f"#{job['id']} {job['category']} x{job['n']} [{job['status']}]"
+    if job["status"] == "running":
+        line += f" {job['done']}/{job['total']} handled"
+    if job["status"] == "done":
+        line += (f" inserted={job['inserted']} skipped={job['skipped']} invalid={job['invalid']}"
+                 f" in {job['latency_ms']} ms")
+    if job["status"] == "failed":
+        if job["inserted"]:
+            line += f" inserted={job['inserted']} skipped={job['skipped']} invalid={job['invalid']}"
+        line += f" error: {job['error']}"
+    return line
+
+
+# standalone worker process: python generation_jobs.py [workers]
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    stop = start_workers(workers)
+    print(f"Generation workers running ({workers}). Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stop.set()
+        print("Stopped.")
@@ -0,0 +1,245 @@
+# Leaderboards kept in app.db and updated as each attempt is recorded.
+# Table leaderboard holds each student's best score per category (whoever reached it
+# first wins ties) plus an "ALL" row whose score is the sum of their category bests.
+# leaderboard_counts is a per-score histogram that also hands out arrival numbers (seq)
+# within each score, and leaderboard_ties is a Fenwick tree over those numbers, so
+# "how many are ahead of me" is a sum over the few distinct score values plus
+# O(log n) tree nodes -- never a count over the students tied with me.
+
+import os
+import datetime
+
+import student_system
+
+DEFAULT_DB_PATH = student_system.DEFAULT_DB_PATH
+OVERALL = "ALL"
+SCORES_TIME_FORMAT = "%d-%m-%Y %H:%M:%S"   # how quiz.record_score writes times to scores.txt
+
+_ready_dbs = set()
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def init_leaderboard(db_path: str = DEFAULT_DB_PATH, scores_file: str = "scores.txt"):
+    """Create the tables; the first time, fill them from the existing scores.txt."""
+    key = os.path.abspath(db_path)
+    if key in _ready_dbs and os.path.exists(key):
+        return
+    conn = student_system._connect(db_path)
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'leaderboard'")
+    is_new = cur.fetchone() is None
+    cur.executescript("""
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            category TEXT,
+            username TEXT,
+            best_score INTEGER,
+            total INTEGER,
+            achieved_at TEXT,
+            seq INTEGER,
+            PRIMARY KEY (category, username)
+        );
+        CREATE INDEX IF NOT EXISTS idx_leaderboard_rank
+            ON leaderboard (category, best_score DESC, seq);
+        CREATE TABLE IF NOT EXISTS leaderboard_counts (
+            category TEXT,
+            best_score INTEGER,
+            n INTEGER,
+            next_seq INTEGER DEFAULT 0,
+            PRIMARY KEY (category, best_score)
+        );
+        CREATE TABLE IF NOT EXISTS leaderboard_ties (
+            category TEXT,
+            best_score INTEGER,
+            node INTEGER,
+            n INTEGER,
+            PRIMARY KEY (category, best_score, node)
+        );
+    """)
+    conn.commit()
+    conn.close()
+    _ready_dbs.add(key)
+    if is_new:
+        rebuild_from_scores(scores_file, db_path)
+
+
+def parse_score(text):
+    """'3/5' -> (3, 5)."""
+    score, _, total = text.partition("/")
+    return int(score), int(total or 0)
+
+
+def _ties_before(cur, category, score, seq):
+    # Fenwick prefix sum: how many holders of `score` arrived before `seq`
+    nodes = []
+    seq -= 1
+    while seq > 0:
+        nodes.append(seq)
+        seq -= seq & -seq
+    if not nodes:
+        return 0
+    cur.execute(f"SELECT COALESCE(SUM(n), 0) FROM leaderboard_ties WHERE category = ? AND best_score = ? "
+                f"AND node IN ({', '.join('?' * len(nodes))})", (category, score, *nodes))
+    return cur.fetchone()[0]
+
+
+def _join_score(cur, category, score):
+    """Count one more holder of `score` and return their arrival number within it."""
+    cur.execute("INSERT OR IGNORE INTO leaderboard_counts (category, best_score, n, next_seq) VALUES (?, ?, 0, 0)",
+                (category, score))
+    cur.execute("UPDATE leaderboard_counts SET n = n + 1, next_seq = next_seq + 1 "
+                "WHERE category = ? AND best_score = ?", (category, score))
+    cur.execute("SELECT next_seq FROM leaderboard_counts WHERE category = ? AND best_score = ?", (category, score))
+    seq = cur.fetchone()[0]
+    # the tree grows by one node; it covers (seq - lowbit, seq], i.e. itself plus the
+    # nodes seq-1, seq-2, seq-4, ... below its lowest set bit
+    children = []
+    step = 1
+    while step < seq & -seq:
+        children.append(seq - step)
+        step <<= 1
+    below = 0
+    if children:
+        cur.execute(f"SELECT COALESCE(SUM(n), 0) FROM leaderboard_ties WHERE category = ? AND best_score = ? "
+                    f"AND node IN ({', '.join('?' * len(children))})", (category, score, *children))
+        below = cur.fetchone()[0]
+    cur.execute("INSERT INTO leaderboard_ties (category, best_score, node, n) VALUES (?, ?, ?, ?)",
+                (category, score, seq, below + 1))
+    return seq
+
+
+def _leave_score(cur, category, score, seq):
+    cur.execute("UPDATE leaderboard_counts SET n = n - 1 WHERE category = ? AND best_score = ?", (category, score))
+    cur.execute("SELECT next_seq FROM leaderboard_counts WHERE category = ? AND best_score = ?", (category, score))
+    size = cur.fetchone()[0]
+    # Fenwick update: seq and every existing node that covers it
+    nodes = []
+    while seq <= size:
+        nodes.append((category, score, seq))
+        seq += seq & -seq
+    cur.executemany("UPDATE leaderboard_ties SET n = n - 1 WHERE category = ? AND best_score = ? AND node = ?", nodes)
+
+
+def _set_best(cur, category, username, old, score, total, when):
+    # old is the current (best_score, seq) row or None
+    if old is not None:
+        _leave_score(cur, category, old[0], old[1])
+    seq = _join_score(cur, category, score)
+    cur.execute("INSERT OR REPLACE INTO leaderboard (category, username, best_score, total, achieved_at, seq) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (category, username, score, total, when, seq))
+
+
+def _record(cur, username, category, score, total, when):
+    cur.execute("SELECT best_score, seq FROM leaderboard WHERE category = ? AND username = ?", (category, username))
+    old = cur.fetchone()
+    if old is not None and score <= old[0]:
+        return False   # not a new best; the earlier arrival keeps the tie
+    _set_best(cur, category, username, old, score, total, when)
+
+    # overall = sum of category bests, so it moves by the improvement
+    cur.execute("SELECT best_score, seq, total FROM leaderboard WHERE category = ? AND username = ?",
+                (OVERALL, username))
+    row = cur.fetchone()
+    gain = score - (old[0] if old else 0)
+    if row is None:
+        _set_best(cur, OVERALL, username, None, gain, total, when)
+    else:
+        _set_best(cur, OVERALL, username, row[:2], row[0] + gain, row[2] + (0 if old is not None else total), when)
+    return True
+
+
+def record_attempt(username, category, score, total=5, when=None, db_path: str = DEFAULT_DB_PATH):
+    """
+    Update the leaderboards with one attempt. `when` is "YYYY-MM-DD HH:MM:SS" (default now).
+    Returns True if it was a new personal best for the category.
+    """
+    init_leaderboard(db_path)
+    conn = student_system._connect(db_path)
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")   # read the current best and update on it without another writer in between
+    changed = _record(cur, username, category, int(score), int(total), when or _now())
+    conn.commit()
+    conn.close()
+    return changed
+
+
+def record_attempts(attempts, db_path: str = DEFAULT_DB_PATH):
+    """record_attempt for many (username, category, score, total, when) rows in one transaction."""
+    init_leaderboard(db_path)
+    conn = student_system._connect(db_path)
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    for username, category, score, total, when in attempts:
+        _record(cur, username, category, int(score), int(total), when or _now())
+    conn.commit()
+    conn.close()
+
+
+def rebuild_from_scores(scores_file: str = "scores.txt", db_path: str = DEFAULT_DB_PATH):
+    """Recompute the leaderboard tables from scores.txt in one transaction. Returns the number of attempts read."""
+    conn = student_system._connect(db_path)
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    cur.execute("DELETE FROM leaderboard")
+    cur.execute("DELETE FROM leaderboard_counts")
+    cur.execute("DELETE FROM leaderboard_ties")
+    count = 0
+    if os.path.exists(scores_file):
+        attempts = []
+        with open(scores_file, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                data = line.strip().split(",")
+                if len(data) < 4:
+                    continue
+                try:
+                    score, total = parse_score(data[2])
+                    when = datetime.datetime.strptime(data[3], SCORES_TIME_FORMAT).strftime("%Y-%m-%d %H:%M:%S")
+                except ValueError:
+                    continue
+                attempts.append((when, data[0], data[1], score, total))
+        # oldest first, so arrival numbers (and ties) follow the time each score was reached
+        attempts.sort()
+        for when, username, category, score, total in attempts:
+            _record(cur, username, category, score, total, when)
+            count += 1
+    conn.commit()
+    conn.close()
+    return count
+
+
+def top_k(category: str = OVERALL, k: int = 10, db_path: str = DEFAULT_DB_PATH):
+    """Best k as (rank, username, best_score, total, achieved_at); walks the rank index."""
+    init_leaderboard(db_path)
+    conn = student_system._connect(db_path)
+    cur = conn.cursor()
+    cur.execute("SELECT username, best_score, total, achieved_at FROM leaderboard WHERE category = ? "
+                "ORDER BY best_score DESC, seq LIMIT ?", (category, k))
+    rows = cur.fetchall()
+    conn.close()
+    return [(i, *row) for i, row in enumerate(rows, 1)]
+
+
+def my_rank(username, category: str = OVERALL, db_path: str = DEFAULT_DB_PATH):
+    """
+    (rank, out_of, best_score, total) for `username`, or None if they have no attempt yet.
+    Students with a higher score come from the histogram (one row per distinct score);
+    equal scores reached earlier come from the tie tree in O(log n) node lookups.
+    """
+    init_leaderboard(db_path)
+    conn = student_system._connect(db_path)
+    cur = conn.cursor()
+    cur.execute("SELECT best_score, total, seq FROM leaderboard WHERE category = ? AND username = ?",
+                (category, username))
+    row = cur.fetchone()
+    if row is None:
+        conn.close()
+        return None
+    score, total, seq = row
+    cur.execute("SELECT COALESCE(SUM(CASE WHEN best_score > ? THEN n ELSE 0 END), 0), COALESCE(SUM(n), 0) "
+                "FROM leaderboard_counts WHERE category = ?", (score, category))
+    higher, out_of = cur.fetchone()
+    ties_ahead = _ties_before(cur, category, score, seq)
+    conn.close()
+    return higher + ties_ahead + 1, out_of, score, total
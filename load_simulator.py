@@ -0,0 +1,251 @@
+# Deterministic load simulator for end-to-end quiz sessions.
+# Drives register -> login -> attempt quiz -> view my scores / rank -> logout for many virtual
+# students, then the admin flows (view students/scores, AI generation with a fake Gemini,
+# search), through the same functions the menus use -- the quiz runs quiz.run_quiz (the
+# core of attempt_quiz: question file, grading, record_score) with a random answerer
+# standing in for input().
+# Reports throughput, latency percentiles per flow and how much the data files grew.
+#
+# Usage: python load_simulator.py [--students N] [--seed S] [--gen-batches K] [--in-place]
+# By default it works on copies of students.txt / scores.txt / app.db in a temp folder;
+# --in-place runs against the real files (simulated users are prefixed "sim<seed>_").
+
+import io
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+import quiz
+import leaderboard
+import student_system
+
+DATA_FILES = ("students.txt", "scores.txt", "app.db")
+
+VOCAB = {
+    "DSA": "array stack queue heap tree graph hash sort search pointer recursion trie "
+           "bucket pivot node edge vertex path cycle matrix window prefix".split(),
+    "DBMS": "index join table key transaction lock schema query view trigger tuple "
+            "relation normal form commit rollback cursor page log replica".split(),
+    "PYTHON": "list tuple dict set class lambda generator decorator module exception "
+              "iterator slice closure scope import yield async await typing string".split(),
+}
+
+
+def make_fake_llm(seed=0, latency=0.0, invalid_rate=0.05, dup_rate=0.1):
+    """
+    Stand-in for call_gemini: returns a JSON array shaped like a real model reply.
+    Some items are invalid (wrong option count / answer) and some repeat an earlier
+    item from the same reply, so the validate and dedupe stages have work to do.
+    """
+    rng = random.Random(seed)
+    calls = [0]
+
+    def fake_llm(prompt):
+        calls[0] += 1
+        # multi-category prompts list "- CATEGORY: N questions" and want a "category" tag per item
+        wanted = [(cat, int(k)) for cat, k in re.findall(r"- (\S+): (\d+) questions", prompt)]
+        tagged = bool(wanted)
+        if not wanted:
+            n = int(re.search(r"exactly (\d+)", prompt).group(1))
+            wanted = [(re.search(r'category "([^"]+)"', prompt).group(1), n)]
+        if latency:
+            time.sleep(latency)
+        items = []
+        for category, n in wanted:
+            words = VOCAB.get(category, VOCAB["DSA"])
+            for i in range(n):
+                r = rng.random()
+                if items and r < dup_rate:
+                    items.append(dict(items[-1]))
+                    continue
+                q = f"[{seed}-{calls[0]}-{category}-{i}] Which {' '.join(rng.sample(words, 6))}?"
+                item = {"question": q, "options": rng.sample(words, 4), "answer": rng.choice("ABCD")}
+                if tagged:
+                    item["category"] = category
+                if r > 1 - invalid_rate:
+                    item["options"] = item["options"][:3]
+                items.append(item)
+        return json.dumps(items)
+
+    return fake_llm
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile: the smallest value with at least p% of the values at or below it."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def file_sizes(folder):
+    sizes = {}
+    for name in DATA_FILES + ("app.db-wal",):
+        path = os.path.join(folder, name)
+        sizes[name] = os.path.getsize(path) if os.path.exists(path) else 0
+    return sizes
+
+
+def _quiz_files(rng, folder):
+    """The real question files; categories without one get a synthetic file in `folder`."""
+    files = {}
+    for cat, words in VOCAB.items():
+        path = quiz.QUIZ_FILES.get(cat)
+        if not path or not os.path.exists(path):
+            path = os.path.join(folder, f"questions_{cat.lower()}.txt")
+            with open(path, "w") as f:
+                for i in range(50):
+                    f.write(f"Q{i}. Which {' '.join(rng.sample(words, 5))}?\n"
+                            f"A. one\nB. two\nC. three\nD. four\nANSWER: {rng.choice('ABCD')}\n\n")
+        files[cat] = path
+    return files
+
+
+def simulate(students=1000, seed=42, gen_batches=5, gen_size=20, folder="."):
+    """Run the simulation in `folder` (the data files live there). Returns the report dict."""
+    rng = random.Random(seed)
+    timings = {}
+
+    def timed(flow, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn(*args, **kwargs)
+        timings.setdefault(flow, []).append((time.perf_counter() - t0) * 1000)
+        return result
+
+    old_cwd = os.getcwd()
+    os.chdir(folder)
+    bank_dir = tempfile.TemporaryDirectory()   # synthetic question files never land in `folder`
+    try:
+        before = file_sizes(".")
+        quiz_files = _quiz_files(rng, bank_dir.name)
+        student_system.users.clear()
+        cats = list(VOCAB)
+        prefix = f"sim{seed}_"
+        t_start = time.perf_counter()
+
+        for i in range(students):
+            username = f"{prefix}{i}"
+            password = f"pw{rng.randrange(10 ** 6)}"
+            user_data = [f"Student {i}", username, password, "LNCTS", f"0157CS{seed:03d}{i:05d}", "B.Tech",
+                         f"{username}@example.com", f"9{rng.randrange(10 ** 9):09d}", "01-01-2005",
+                         rng.choice(["Male", "Female"]), "", "user"]
+            timed("register", student_system.create_user, user_data)
+            timed("login", student_system.login_user, username, password)
+
+            cat = cats[rng.randrange(len(cats))]
+            timed("quiz_attempt", quiz.run_quiz, student_system.logged_user, cat, quiz_files[cat],
+                  lambda q: rng.choice("ABCD"), rng=rng)
+
+            timed("view_my_scores", quiz.view_my_scores)
+            timed("my_rank", leaderboard.my_rank, username)
+            timed("logout", student_system.logout)
+
+        # admin flows
+        import ai_questions_gemini_db
+        fake_llm = make_fake_llm(seed)
+        admin = [prefix + "admin", "adminpw"]
+        timed("register", student_system.create_user,
+              ["Sim Admin", admin[0], admin[1], "LNCTS", "0", "B.Tech", "admin@example.com", "0",
+               "01-01-2000", "Male", "", "admin"])
+        timed("login", student_system.login_user, *admin)
+        timed("admin_view_students", lambda: student_system.users_page(0, 20))
+        timed("admin_view_scores", lambda: quiz.scores_page(0, 20))
+        for cat in cats + [leaderboard.OVERALL]:
+            timed("leaderboard_top10", leaderboard.top_k, cat, 10)
+        gen_totals = {"parsed": 0, "invalid": 0, "inserted": 0, "skipped": 0}
+        for b in range(gen_batches):
+            counts = timed("admin_generate", ai_questions_gemini_db.generate_questions_with_counts,
+                           cats[b % len(cats)], gen_size, sleep_after=0, llm=fake_llm, generate_workers=1)
+            for k in gen_totals:
+                gen_totals[k] += counts[k]
+        # nightly-refresh style: every category in shared prompts
+        counts = timed("admin_generate_multi", ai_questions_gemini_db.generate_multi_category_to_db,
+                       cats, gen_size, sleep_after=0, llm=fake_llm, generate_workers=1)
+        for k in gen_totals:
+            gen_totals[k] += counts[k]
+        for word in ("heap", "transaction", "decorator"):
+            timed("admin_search", student_system.search_questions, word)
+        timed("logout", student_system.logout)
+
+        wall = time.perf_counter() - t_start
+        after = file_sizes(".")
+    finally:
+        os.chdir(old_cwd)
+        bank_dir.cleanup()
+
+    ops = sum(len(v) for v in timings.values())
+    flows = {}
+    for flow, values in timings.items():
+        values.sort()
+        flows[flow] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3),
+        }
+    return {
+        "seed": seed,
+        "students": students,
+        "wall_s": round(wall, 3),
+        "ops": ops,
+        "ops_per_s": round(ops / wall, 1) if wall else None,
+        "sessions_per_s": round(students / wall, 1) if wall else None,
+        "flows": flows,
+        "generation": gen_totals,
+        "storage": {name: {"before": before[name], "after": after[name], "growth": after[name] - before[name]}
+                    for name in before},
+    }
+
+
+def print_report(report):
+    print(f"Seed {report['seed']}: {report['students']} students in {report['wall_s']} s "
+          f"-> {report['sessions_per_s']} sessions/s, {report['ops_per_s']} ops/s")
+    print(f"\n{'flow':<20} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for flow, st in report["flows"].items():
+        print(f"{flow:<20} {st['count']:>6} {st['p50_ms']:>9.3f} {st['p95_ms']:>9.3f} "
+              f"{st['p99_ms']:>9.3f} {st['max_ms']:>9.3f}")
+    g = report["generation"]
+    print(f"\nGeneration (fake Gemini): parsed {g['parsed']}, inserted {g['inserted']}, "
+          f"skipped {g['skipped']}, invalid {g['invalid']}")
+    print(f"\n{'file':<14} {'before':>12} {'after':>12} {'growth':>12}")
+    for name, st in report["storage"].items():
+        print(f"{name:<14} {st['before']:>12} {st['after']:>12} {st['growth']:>12}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate many students and an admin using the quiz.")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--gen-batches", type=int, default=5)
+    parser.add_argument("--gen-size", type=int, default=20)
+    parser.add_argument("--in-place", action="store_true", help="use the real data files in this folder")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.in_place:
+        report = simulate(args.students, args.seed, args.gen_batches, args.gen_size, ".")
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in DATA_FILES:
+                if os.path.exists(name):
+                    shutil.copy(name, tmp)
+            report = simulate(args.students, args.seed, args.gen_batches, args.gen_size, tmp)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
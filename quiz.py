@@ -8,6 +8,13 @@ import random
 import datetime
 
 current_user = ""
+job_workers = None   # stop event of the background generation workers, once started
+
+QUIZ_FILES = {
+    "DSA": "questions_dsa.txt",
+    "DBMS": "questions_dbms.txt",
+    "PYTHON": "questions_python.txt",
+}
 
 
 def load_questions(filename):
@@ -33,35 +40,117 @@ def attempt_quiz(category, filename):
     student_system.load_users()
 
     print(f"\n--- {category} QUIZ ---")
-    data = load_questions(filename)
 
-    if not data:
-        return
-
-    random.shuffle(data)
-    data = data[:5]
-
-    score = 0
-    for q in data:
+    def ask(q):
         print("\n" + q[0])
         print(q[1])
         print(q[2])
         print(q[3])
         print(q[4])
+        return input("Your Answer (A/B/C/D): ")
+
+    result = run_quiz(student_system.logged_user, category, filename, ask)
+    if result is None:
+        return
+
+    print(f"\nYour Score: {result[0]}/{result[1]}")
+    print("Score Saved.\n")
+
+
+def run_quiz(username, category, filename, answer, count=5, rng=random):
+    """
+    The non-interactive part of attempt_quiz (also driven by the load simulator):
+    pick `count` questions from `filename`, ask `answer(question_block)` for a letter,
+    grade and record the score. Returns (score, total), or None if there are no questions.
+    """
+    data = load_questions(filename)
+    if not data:
+        return None
+
+    rng.shuffle(data)
+    data = data[:count]
+
+    score = 0
+    for q in data:
         correct = q[5].split("ANSWER:")[1].strip().upper()
-        ans = input("Your Answer (A/B/C/D): ").upper()
-        if ans == correct:
+        if answer(q).strip().upper() == correct:
             score += 1
 
-    print(f"\nYour Score: {score}/5")
+    record_score(username, category, score, count)
+    return score, count
+
 
-    time_now = datetime.datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+def record_score(username, category, score, total=5):
+    record_scores([(username, category, score, total)])
+
+
+def record_scores(rows):
+    """Append several (username, category, score, total) attempts with one file write."""
+    now = datetime.datetime.now()
+    time_now = now.strftime("%d-%m-%Y %H:%M:%S")
 
     f = open("scores.txt", "a")
-    f.write(f"{student_system.logged_user},{category},{score}/5,{time_now}\n")
+    f.write("".join(f"{u},{c},{s}/{t},{time_now}\n" for u, c, s, t in rows))
     f.close()
 
-    print("Score Saved.\n")
+    # keep the leaderboards current; scores.txt stays the source of truth
+    try:
+        import leaderboard
+        when = now.strftime("%Y-%m-%d %H:%M:%S")
+        leaderboard.record_attempts([(u, c, s, t, when) for u, c, s, t in rows])
+    except Exception as e:
+        print("Leaderboard not updated:", e)
+
+
+def scores_page(cursor=0, limit=20, username=None, filename="scores.txt"):
+    """
+    One page of (username, category, score, date) rows from scores.txt, optionally for one user.
+    `cursor` is a byte offset (0 = start); returns (rows, next_cursor), next_cursor is None at the end.
+    """
+    rows = []
+    if not os.path.exists(filename):
+        return rows, None
+    with open(filename, "rb") as f:
+        f.seek(cursor)
+        while len(rows) < limit:
+            line = f.readline()
+            if not line:
+                return rows, None
+            data = line.decode("utf-8", errors="replace").strip().split(",")
+            if len(data) < 4:
+                continue
+            if username is None or data[0] == username:
+                rows.append(tuple(data[:4]))
+        return rows, f.tell()
+
+
+def iter_scores(username=None, filename="scores.txt", page_size=500):
+    """Yield every score row, one page in memory at a time."""
+    cursor = 0
+    while cursor is not None:
+        rows, cursor = scores_page(cursor, page_size, username, filename)
+        yield from rows
+
+
+def view_leaderboard(k=10):
+    import leaderboard
+    cat = input("Category (DSA/DBMS/PYTHON, blank = overall): ").strip().upper() or leaderboard.OVERALL
+
+    rows = leaderboard.top_k(cat, k)
+    if not rows:
+        print("No attempts recorded yet.")
+        return
+    title = "Overall (sum of best scores)" if cat == leaderboard.OVERALL else cat
+    print(f"\n--- Leaderboard: {title} ---\n")
+    for rank, username, best, total, when in rows:
+        print(f"{rank:>3}. {username:<20} {best}/{total}  ({when})")
+
+    if student_system.logged:
+        mine = leaderboard.my_rank(student_system.logged_user, cat)
+        if mine:
+            print(f"\nYour rank: {mine[0]} of {mine[1]} (best {mine[2]}/{mine[3]})")
+        else:
+            print("\nYou have no attempts in this category yet.")
 
 
 def view_my_scores():
@@ -70,14 +159,10 @@ def view_my_scores():
         return
 
     print("\n--- My Score History ---\n")
-    f = open("scores.txt", "r")
     found = False
-    for line in f:
-        data = line.strip().split(",")
-        if data[0] == student_system.logged_user:
-            print(f"Category: {data[1]} | Score: {data[2]} | Date: {data[3]}")
-            found = True
-    f.close()
+    for _, category, score, date in iter_scores(student_system.logged_user):
+        print(f"Category: {category} | Score: {score} | Date: {date}")
+        found = True
 
     if not found:
         print("No score history yet.")
@@ -105,71 +190,187 @@ def admin_panel():
         print("1. View All Students")
         print("2. View All Scores")
         print("3. Generate AI Questions (Gemini -> DB)")
-        print("4. Back")
+        print("4. View Generation Jobs")
+        print("5. Search Question Bank")
+        print("6. Export Data (CSV/JSONL)")
+        print("7. Leaderboards")
+        print("8. Back")
         ch = input("Choose: ").strip()
 
         if ch == "1":
             print("\n--- Registered Students ---\n")
-            for u, d in student_system.users.items():
-                print(f"{d['full_name']} ({u}) - {d.get('role','user')}")
+            show_pages(student_system.users_page,
+                       lambda row: print(f"{row[1]['full_name']} ({row[0]}) - {row[1].get('role','user')}"))
         elif ch == "2":
             if not os.path.exists("scores.txt"):
                 print("No scores recorded.")
             else:
                 print("\n--- Score Records ---\n")
-                with open("scores.txt", "r", encoding="utf-8") as f:
-                    for line in f:
-                        print(line.strip())
+                show_pages(scores_page, lambda row: print(",".join(row)))
         elif ch == "3":
             # Generate AI questions using Gemini -> DB
             try:
-                cat = input("Category (DSA/DBMS/PYTHON): ").strip().upper()
-                if cat == "":
+                cat = input("Category (DSA/DBMS/PYTHON, or several e.g. DSA,DBMS,PYTHON): ").strip().upper()
+                cats = [c.strip() for c in cat.split(",") if c.strip()]
+                if not cats:   # blank, or only commas
                     print("No category entered. Cancelled.")
                     continue
                 try:
-                    n = int(input("How many questions to generate? (default 5): ").strip() or "5")
+                    n = int(input("How many questions to generate (per category)? (default 5): ").strip() or "5")
                 except ValueError:
                     n = 5
 
                 # lazy import so module only required when used
                 try:
-                    from ai_questions_gemini_db import generate_questions_to_db
+                    from ai_questions_gemini_db import generate_questions_with_counts, generate_multi_category_to_db
+                    from ai_questions_gemini_db import format_pipeline_stats, genai_available
                 except Exception as e:
                     print("AI generator module not found or failed to import:", e)
-                    print("Make sure ai_questions_gemini_db.py exists and google-genai is installed.")
+                    print("Make sure ai_questions_gemini_db.py exists.")
                     continue
+                # the SDK itself is only imported on the first Gemini call, so check for it up front
+                if not genai_available():
+                    print("google-genai is not installed. Install it with: pip install google-genai")
+                    continue
+
+                if input("Run as a background job? (y/N): ").strip().lower() == "y":
+                    job_id = enqueue_generation_job(",".join(cats), n)
+                    print(f"Queued job #{job_id}. Check progress with 'View Generation Jobs'.")
+                    continue
+
+                # several categories share prompts (one round trip for all of them)
+                if len(cats) > 1:
+                    generate = lambda preview=False: generate_multi_category_to_db(cats, n, preview=preview)
+                else:
+                    generate = lambda preview=False: generate_questions_with_counts(cats[0], n, preview=preview)
 
                 preview = input("Preview generated questions before inserting? (y/N): ").strip().lower() == "y"
                 if preview:
-                    items = generate_questions_to_db(cat, n, preview=True)
+                    items = generate(preview=True)
                     if not items:
                         print("No valid questions parsed from the model.")
                         continue
                     print("\n--- Preview ---")
                     for i, it in enumerate(items, 1):
-                        print(f"\nQ{i}: {it['question']}")
+                        print(f"\nQ{i} [{it.get('category', cats[0])}]: {it['question']}")
                         print("A.", it["options"][0])
                         print("B.", it["options"][1])
                         print("C.", it["options"][2])
                         print("D.", it["options"][3])
                         print("ANSWER:", it["answer"])
                     if input("\nInsert these into DB? (y/N): ").strip().lower() == "y":
-                        added = generate_questions_to_db(cat, n, preview=False)
-                        print(f"Inserted {added} question(s) into the database.")
+                        counts = generate()
+                        print_generation_counts(counts)
+                        print(format_pipeline_stats(counts))
                     else:
                         print("Cancelled. No questions inserted.")
                 else:
-                    added = generate_questions_to_db(cat, n, preview=False)
-                    print(f"Inserted {added} question(s) into the database.")
+                    counts = generate()
+                    print_generation_counts(counts)
+                    print(format_pipeline_stats(counts))
             except Exception as e:
                 print("Failed to generate AI questions:", e)
         elif ch == "4":
+            import generation_jobs
+            jobs = generation_jobs.list_jobs()
+            if not jobs:
+                print("No generation jobs yet.")
+            else:
+                print("\n--- Generation Jobs (latest first) ---\n")
+                for job in jobs:
+                    print(generation_jobs.format_job(job))
+        elif ch == "5":
+            search_question_bank()
+        elif ch == "6":
+            export_data()
+        elif ch == "7":
+            view_leaderboard(k=50)
+        elif ch == "8":
             break
         else:
             print("Invalid Choice.")
 
 
+def print_generation_counts(counts):
+    print(f"Inserted {counts['inserted']} question(s) into the database "
+          f"(skipped {counts['skipped']} duplicate(s), {counts['invalid']} invalid).")
+    if len(counts.get("by_category", {})) > 1:
+        for c, st in counts["by_category"].items():
+            print(f"  {c}: inserted {st['inserted']}, skipped {st['skipped']}, invalid {st['invalid']}")
+    if counts.get("failed"):
+        print(f"{counts['failed']} question(s) could not be written.")
+    for err in counts.get("errors", []):
+        print("  error:", err)
+
+
+def show_pages(fetch_page, show_row, page_size=20):
+    # fetch_page(cursor, limit) -> (rows, next_cursor); 0 = first page, None = no more pages
+    cursor = 0
+    while True:
+        rows, cursor = fetch_page(cursor, page_size)
+        for row in rows:
+            show_row(row)
+        if cursor is None:
+            return
+        if input("\nNext page? (Y/n): ").strip().lower() == "n":
+            return
+
+
+def export_data():
+    import exports
+    print("Export what? 1. Questions  2. Students  3. Scores")
+    what = input("Choose: ").strip()
+    fmt = input("Format (csv/jsonl, default csv): ").strip().lower() or "csv"
+    if fmt not in ("csv", "jsonl"):
+        print("Unknown format.")
+        return
+
+    if what == "1":
+        rows, fields, name = student_system.iter_questions(), exports.QUESTION_FIELDS, "questions"
+    elif what == "2":
+        rows, fields, name = exports.user_rows(student_system.iter_users()), exports.USER_FIELDS, "students"
+    elif what == "3":
+        rows, fields, name = iter_scores(), exports.SCORE_FIELDS, "scores"
+    else:
+        print("Invalid Choice.")
+        return
+
+    path = input(f"Output file (default {name}_export.{fmt}): ").strip() or f"{name}_export.{fmt}"
+    count = exports.export_rows(rows, fields, path, fmt)
+    print(f"Exported {count} row(s) to {path}.")
+
+
+def search_question_bank(page_size=10):
+    query = input("Search for (e.g. B-tree, normalization): ").strip()
+    if query == "":
+        print("Nothing to search.")
+        return
+    cat = input("Category (DSA/DBMS/PYTHON, blank = all): ").strip().upper() or None
+
+    offset = 0
+    while True:
+        rows = student_system.search_questions(query, cat, limit=page_size, offset=offset)
+        if not rows:
+            print("No (more) matching questions.")
+            return
+        print(f"\n--- Results {offset + 1}-{offset + len(rows)} ---")
+        for qid, qcat, qtext, a, b, c, d, ans in rows:
+            print(f"\n#{qid} [{qcat}] {qtext}")
+            print(f"  A. {a}  B. {b}  C. {c}  D. {d}  ANSWER: {ans}")
+        if len(rows) < page_size or input("\nNext page? (y/N): ").strip().lower() != "y":
+            return
+        offset += page_size
+
+
+def enqueue_generation_job(category, n):
+    global job_workers
+    import generation_jobs
+    job_id = generation_jobs.enqueue_job(category, n)
+    # workers run as daemon threads so the quiz keeps serving while jobs run
+    if job_workers is None:
+        job_workers = generation_jobs.start_workers()
+    return job_id
+
 
 def quiz_menu():
     while True:
@@ -182,11 +383,11 @@ def quiz_menu():
         choice = input("Choose: ")
 
         if choice == "1":
-            attempt_quiz("DSA", "questions_dsa.txt")
+            attempt_quiz("DSA", QUIZ_FILES["DSA"])
         elif choice == "2":
-            attempt_quiz("DBMS", "questions_dbms.txt")
+            attempt_quiz("DBMS", QUIZ_FILES["DBMS"])
         elif choice == "3":
-            attempt_quiz("PYTHON", "questions_python.txt")
+            attempt_quiz("PYTHON", QUIZ_FILES["PYTHON"])
         elif choice == "4":
             break
         else:
@@ -203,8 +404,9 @@ def main():
         print("5. Show Profile")
         print("6. Update Profile")
         print("7. Admin Panel")
-        print("8. Logout")
-        print("9. Exit")
+        print("8. Leaderboard")
+        print("9. Logout")
+        print("10. Exit")
 
         ch = input("Choose an option: ")
 
@@ -226,8 +428,10 @@ def main():
         elif ch == "7":
             admin_panel()
         elif ch == "8":
-            student_system.logout()
+            view_leaderboard()
         elif ch == "9":
+            student_system.logout()
+        elif ch == "10":
             print("Program Ended.")
             break
         else:
@@ -0,0 +1,265 @@
+# Multi-process serving mode for the quiz (used as a library: see bench_server.py
+# and load_simulator.py for callers).
+# The question bank is loaded once in the parent and shared read-only with the
+# worker processes (inherited on fork, reloaded per worker on spawn). Workers never
+# write to disk themselves: scores, registrations and new questions are sent over a
+# bounded queue to one coordinator thread in the parent, so scores.txt / students.txt /
+# app.db only ever have a single writer, and a full queue slows the workers down
+# instead of letting unwritten work pile up.
+#
+# login() checks the password and hands out a signed login token; start_quiz() needs
+# one and hands out a signed session token listing the questions it issued;
+# submit_answers() only grades those questions, each once, out of that fixed count,
+# and the coordinator records each session at most once. Registrations go through the
+# coordinator's duplicate check, and the answer is sent back to the worker that asked.
+
+import os
+import hmac
+import queue
+import random
+import hashlib
+import threading
+import multiprocessing
+
+import quiz
+import student_system
+
+bank = {}        # category -> list of question blocks, read-only once loaded
+_writes = None   # queue to the coordinator (None = apply writes in this process)
+_secret = os.urandom(32)   # signs session tokens; passed to the workers
+_used_sessions = set()     # sessions already recorded (lives where writes are applied)
+_replies = None  # {"data": dict, "cond": Condition} shared through a Manager: coordinator -> workers
+
+WRITE_QUEUE_SIZE = 10000
+WRITE_BATCH = 500
+
+
+def load_bank(files=None):
+    global bank
+    if files is None:
+        files = quiz.QUIZ_FILES
+    bank = {cat: quiz.load_questions(fn) for cat, fn in files.items()}
+    return bank
+
+
+def _sign(body):
+    return hmac.new(_secret, body.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def _make_token(kind, *fields):
+    body = "|".join([kind, *fields, os.urandom(8).hex()])
+    return body + "|" + _sign(body)
+
+
+def _open_token(token, kind):
+    """Check a token from _make_token(); returns its fields (without kind and nonce)."""
+    body, _, sig = (token or "").rpartition("|")
+    if not body or not hmac.compare_digest(sig, _sign(body)):
+        raise ValueError(f"Invalid or tampered {kind} token.")
+    fields = body.split("|")
+    if fields[0] != kind:
+        raise ValueError(f"Not a {kind} token.")
+    return fields[1:-1]
+
+
+def _open_session(session):
+    """Check a token from start_quiz(); returns (username, category, issued indices)."""
+    username, category, picked = _open_token(session, "quiz")
+    return username, category, [int(i) for i in picked.split(".") if i]
+
+
+def login(username, password):
+    """Check the password against students.txt and return a login token for start_quiz()."""
+    if "|" in username:
+        raise ValueError("Username may not contain '|'.")
+    if not student_system.check_password(username, password):
+        raise ValueError("Incorrect username or password.")
+    return _make_token("login", username)
+
+
+def start_quiz(login_token, category, count=5, seed=None):
+    """
+    Pick `count` questions for a new attempt by the user of `login_token` (from login()).
+    Returns {"session": token, "questions": [(question_index, [question, A, B, C, D]), ...]};
+    the answer lines are not sent. Pass the token back to submit_answers().
+    Raises ValueError for a bad login token or a category with no questions.
+    """
+    username, = _open_token(login_token, "login")
+    if "|" in category:
+        raise ValueError("Category may not contain '|'.")
+    data = bank.get(category)
+    if not data:
+        raise ValueError(f"No questions for category {category!r}.")
+    rng = random.Random(seed)
+    picked = rng.sample(range(len(data)), min(count, len(data)))
+    return {"session": _make_token("quiz", username, category, ".".join(str(i) for i in picked)),
+            "questions": [(i, data[i][:5]) for i in picked]}
+
+
+def submit_answers(session, answers):
+    """
+    Grade `answers` (list of (question_index, letter)) for a session from start_quiz()
+    and queue the score write. Only the issued questions count, each at most once;
+    unanswered ones score 0 and the total is the number issued. Returns (score, total).
+    Raises ValueError for a bad session, a question that was not issued, or a repeat.
+    """
+    username, category, issued = _open_session(session)
+    data = bank.get(category, [])
+    given = {}
+    for i, ans in answers:
+        if i not in issued:
+            raise ValueError(f"Question {i} was not part of this quiz.")
+        if i in given:
+            raise ValueError(f"Question {i} answered more than once.")
+        given[i] = ans
+
+    score = 0
+    for i in issued:
+        correct = data[i][5].split("ANSWER:")[1].strip().upper()
+        if (given.get(i) or "").strip().upper() == correct:
+            score += 1
+    _submit_write("score", (session, username, category, score, len(issued)))
+    return score, len(issued)
+
+
+def register_user(user_data):
+    """
+    Register through the coordinator's duplicate check (student_system.create_user).
+    Waits for the answer; raises ValueError if the username is taken.
+    """
+    if _writes is None:
+        created = _apply_writes([("user", (list(user_data), None))])[None]
+    else:
+        reply_id = os.urandom(8).hex()
+        _writes.put(("user", (list(user_data), reply_id)))
+        with _replies["cond"]:
+            _replies["cond"].wait_for(lambda: reply_id in _replies["data"])
+        created = _replies["data"].pop(reply_id)
+    if not created:
+        raise ValueError("Username already exists.")
+
+
+def add_question(category, qtext, opts, answer, source="manual"):
+    _submit_write("question", (category, qtext, list(opts), answer, source))
+
+
+def handle_request(req):
+    """Entry point for pool workers. `req` is a tuple whose first item names the operation."""
+    op = req[0]
+    if op == "login":
+        return login(*req[1:])
+    if op == "start":
+        return start_quiz(*req[1:])
+    if op == "submit":
+        return submit_answers(*req[1:])
+    if op == "register":
+        return register_user(*req[1:])
+    if op == "add_question":
+        return add_question(*req[1:])
+    raise ValueError(f"Unknown request: {op}")
+
+
+def _submit_write(kind, payload):
+    if _writes is None:
+        _apply_writes([(kind, payload)])
+    else:
+        _writes.put((kind, payload))   # blocks while the queue is full (backpressure)
+
+
+def _apply_writes(items, replies=None):
+    """
+    Apply a batch of writes; scores go to scores.txt and the leaderboard in one go.
+    Fills and returns `replies` with {reply_id: created} for the registrations in the batch.
+    """
+    scores = []
+    replies = {} if replies is None else replies
+    for kind, payload in items:
+        if kind == "score":
+            session, username, category, score, total = payload
+            if session in _used_sessions:
+                continue   # the same quiz submitted twice is recorded once
+            _used_sessions.add(session)
+            scores.append((username, category, score, total))
+        elif kind == "user":
+            user_data, reply_id = payload
+            replies[reply_id] = student_system.create_user(user_data)
+        elif kind == "question":
+            category, qtext, opts, answer, source = payload
+            student_system.insert_question_with_dup_check(category, qtext, opts, answer, source=source)
+    if scores:
+        quiz.record_scores(scores)
+    return replies
+
+
+def _coordinator(q, applied, replies):
+    done = False
+    while not done:
+        items = [q.get()]
+        # take whatever else is already waiting, so one file append / one transaction covers many writes
+        while len(items) < WRITE_BATCH:
+            try:
+                items.append(q.get_nowait())
+            except queue.Empty:
+                break
+        if None in items:
+            done = True
+            items = [it for it in items if it is not None]
+        answers = {}
+        try:
+            _apply_writes(items, answers)
+        except Exception as e:
+            print("Write failed:", e)
+            # don't leave registering workers waiting forever
+            for kind, payload in items:
+                if kind == "user":
+                    answers.setdefault(payload[1], False)
+        if answers:
+            with replies["cond"]:
+                replies["data"].update(answers)
+                replies["cond"].notify_all()
+        with applied["cond"]:
+            applied["count"] += len(items)
+            applied["cond"].notify_all()
+
+
+def _init_worker(q, files, secret, replies):
+    global _writes, _secret, _replies
+    _writes = q
+    _secret = secret
+    _replies = replies
+    # with the "spawn" start method (Windows/macOS) the bank is not inherited
+    if not bank:
+        load_bank(files)
+
+
+def start_server(workers=None, files=None, queue_size=WRITE_QUEUE_SIZE):
+    """
+    Load the bank, start the write coordinator and a pool of `workers` processes.
+    Returns a handle to pass to stop_server(); use handle["pool"] to run requests.
+    """
+    load_bank(files)
+    writes = multiprocessing.Queue(queue_size)
+    applied = {"count": 0, "cond": threading.Condition()}
+    manager = multiprocessing.Manager()
+    replies = {"data": manager.dict(), "cond": manager.Condition()}
+    writer = threading.Thread(target=_coordinator, args=(writes, applied, replies), daemon=True)
+    writer.start()
+    pool = multiprocessing.Pool(workers or os.cpu_count(), initializer=_init_worker,
+                                initargs=(writes, files, _secret, replies))
+    return {"pool": pool, "writes": writes, "writer": writer, "applied": applied, "manager": manager}
+
+
+def wait_for_writes(server, count, timeout=None):
+    """Block until the coordinator has applied at least `count` writes in total."""
+    applied = server["applied"]
+    with applied["cond"]:
+        return applied["cond"].wait_for(lambda: applied["count"] >= count, timeout)
+
+
+def stop_server(server):
+    """Stop the workers, then drain every pending write before returning."""
+    server["pool"].close()
+    server["pool"].join()
+    server["writes"].put(None)
+    server["writer"].join()
+    server["manager"].shutdown()
@@ -3,15 +3,33 @@
 # Branch - CSE
 
 import os
-import sqlite3
 import datetime
-import difflib
 from typing import List
 
 logged_user = ""
 logged = False
 
 users = {}   # to store user data in memory (useful for Assignment 3)
+_users_stamp = None   # (mtime, size) of students.txt when check_password last loaded it
+
+
+def _parse_user_line(line):
+    data = line.strip().split(",")
+    if len(data) < 12:
+        return None
+    return data[1], {
+        "full_name": data[0],
+        "password": data[2],
+        "college": data[3],
+        "enrollment_no": data[4],
+        "course": data[5],
+        "email": data[6],
+        "phone": data[7],
+        "dob": data[8],
+        "gender": data[9],
+        "guardian_name": data[10],
+        "role": data[11]
+    }
 
 
 def load_users():
@@ -20,21 +38,37 @@ def load_users():
         return
     with open("students.txt", "r") as f:
         for line in f:
-            data = line.strip().split(",")
-            if len(data) >= 12:
-                users[data[1]] = {
-                    "full_name": data[0],
-                    "password": data[2],
-                    "college": data[3],
-                    "enrollment_no": data[4],
-                    "course": data[5],
-                    "email": data[6],
-                    "phone": data[7],
-                    "dob": data[8],
-                    "gender": data[9],
-                    "guardian_name": data[10],
-                    "role": data[11]
-                }
+            parsed = _parse_user_line(line)
+            if parsed:
+                users[parsed[0]] = parsed[1]
+
+
+def users_page(cursor: int = 0, limit: int = 20, filename: str = "students.txt"):
+    """
+    One page of (username, data) from students.txt without loading the whole file.
+    `cursor` is a byte offset (0 = start); returns (rows, next_cursor), next_cursor is None at the end.
+    """
+    rows = []
+    if not os.path.exists(filename):
+        return rows, None
+    with open(filename, "rb") as f:
+        f.seek(cursor)
+        while len(rows) < limit:
+            line = f.readline()
+            if not line:
+                return rows, None
+            parsed = _parse_user_line(line.decode("utf-8", errors="replace"))
+            if parsed:
+                rows.append(parsed)
+        return rows, f.tell()
+
+
+def iter_users(filename: str = "students.txt", page_size: int = 500):
+    """Yield (username, data) for every registered user, one page in memory at a time."""
+    cursor = 0
+    while cursor is not None:
+        rows, cursor = users_page(cursor, page_size, filename)
+        yield from rows
 
 
 def save_user(user_data):
@@ -83,24 +117,64 @@ def register():
         email, phone, dob, gender, guardian_name, role
     ]
 
+    if create_user(user_data):
+        print("\nSuccessfully Registered.\n")
+    else:
+        print("Username already exists. Try another.")
+
+
+def create_user(user_data):
+    """
+    Non-interactive registration (used by register() and the load simulator).
+    `user_data` is the 12 students.txt fields in file order. Returns False if the username is taken.
+    """
+    load_users()
+    if user_data[1] in users:
+        return False
     save_user(user_data)
-    print("\nSuccessfully Registered.\n")
+    _, users[user_data[1]] = _parse_user_line(",".join(user_data))
+    return True
+
+
+def check_password(username, password):
+    """
+    Password check without the session globals (for quiz_server workers).
+    students.txt is only re-read when it changed since the last check.
+    """
+    global _users_stamp
+    try:
+        st = os.stat("students.txt")
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+    if stamp != _users_stamp:
+        load_users()
+        _users_stamp = stamp
+    data = users.get(username)
+    return data is not None and data["password"] == password
 
 
 def login():
-    global logged, logged_user
     print("\nLog in:")
     username = input("Username: ")
     password = input("Password: ")
 
+    if login_user(username, password):
+        print("\nLogin Successful.\n")
+    else:
+        print("\nIncorrect Username or Password.\n")
+
+
+def login_user(username, password):
+    """Non-interactive login; sets the session globals and returns True on success."""
+    global logged, logged_user
     load_users()
 
     if username in users and users[username]["password"] == password:
         logged = True
         logged_user = username
-        print("\nLogin Successful.\n")
-    else:
-        print("\nIncorrect Username or Password.\n")
+        return True
+    return False
 
 
 def show_profile():
@@ -211,8 +285,18 @@ def main():
 
 DEFAULT_DB_PATH = "app.db"
 
+_ready_dbs = set()   # databases already initialised by this process
+
+def _connect(db_path: str = DEFAULT_DB_PATH):
+    # sqlite3 is imported on first use so the student/quiz path starts without it
+    import sqlite3
+    return sqlite3.connect(db_path)
+
 def init_questions_table(db_path: str = DEFAULT_DB_PATH):
-    conn = sqlite3.connect(db_path)
+    key = os.path.abspath(db_path)
+    if key in _ready_dbs and os.path.exists(key):
+        return
+    conn = _connect(db_path)
     cur = conn.cursor()
     cur.execute("""
         CREATE TABLE IF NOT EXISTS questions (
@@ -234,16 +318,59 @@ def init_questions_table(db_path: str = DEFAULT_DB_PATH):
         cur.execute("ALTER TABLE questions ADD COLUMN source TEXT")
     if "created_at" not in cols:
         cur.execute("ALTER TABLE questions ADD COLUMN created_at TEXT")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_questions_category_id ON questions (category, id)")
     conn.commit()
+    _init_questions_fts(conn)
     conn.close()
+    _ready_dbs.add(key)
+
+def _init_questions_fts(conn):
+    """
+    Full-text index over question text and options (FTS5, external content = questions).
+    Triggers keep it in sync with every insert/update/delete on questions.
+    If this SQLite build has no FTS5, search_questions() falls back to LIKE.
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'questions_fts'")
+    if cur.fetchone():
+        return
+    try:
+        cur.execute("""
+            CREATE VIRTUAL TABLE questions_fts USING fts5(
+                qtext, opt_a, opt_b, opt_c, opt_d,
+                content='questions', content_rowid='id'
+            )
+        """)
+    except Exception:
+        return
+    cur.executescript("""
+        CREATE TRIGGER IF NOT EXISTS questions_fts_ai AFTER INSERT ON questions BEGIN
+            INSERT INTO questions_fts (rowid, qtext, opt_a, opt_b, opt_c, opt_d)
+            VALUES (new.id, new.qtext, new.opt_a, new.opt_b, new.opt_c, new.opt_d);
+        END;
+        CREATE TRIGGER IF NOT EXISTS questions_fts_ad AFTER DELETE ON questions BEGIN
+            INSERT INTO questions_fts (questions_fts, rowid, qtext, opt_a, opt_b, opt_c, opt_d)
+            VALUES ('delete', old.id, old.qtext, old.opt_a, old.opt_b, old.opt_c, old.opt_d);
+        END;
+        CREATE TRIGGER IF NOT EXISTS questions_fts_au AFTER UPDATE ON questions BEGIN
+            INSERT INTO questions_fts (questions_fts, rowid, qtext, opt_a, opt_b, opt_c, opt_d)
+            VALUES ('delete', old.id, old.qtext, old.opt_a, old.opt_b, old.opt_c, old.opt_d);
+            INSERT INTO questions_fts (rowid, qtext, opt_a, opt_b, opt_c, opt_d)
+            VALUES (new.id, new.qtext, new.opt_a, new.opt_b, new.opt_c, new.opt_d);
+        END;
+    """)
+    # index the questions that existed before the FTS table
+    cur.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
+    conn.commit()
 
 def _normalize_text(s: str) -> str:
     return " ".join(s.lower().strip().split())
 
 def question_similar_exists(qtext: str, category: str, threshold: float = 0.8, db_path: str = DEFAULT_DB_PATH) -> bool:
+    import difflib
     init_questions_table(db_path)
     q_norm = _normalize_text(qtext)
-    conn = sqlite3.connect(db_path)
+    conn = _connect(db_path)
     cur = conn.cursor()
     cur.execute("SELECT qtext FROM questions WHERE category = ?", (category,))
     rows = cur.fetchall()
@@ -257,6 +384,94 @@ def question_similar_exists(qtext: str, category: str, threshold: float = 0.8, d
             return True
     return False
 
+def load_normalized_questions_by_category(categories: List[str], db_path: str = DEFAULT_DB_PATH) -> dict:
+    """Normalized text of every question in `categories`, in one query, for batch duplicate checks: {category: [texts]}."""
+    init_questions_table(db_path)
+    texts = {cat: [] for cat in categories}
+    if not categories:
+        return texts
+    conn = _connect(db_path)
+    cur = conn.cursor()
+    cur.execute(f"SELECT category, qtext FROM questions WHERE category IN ({', '.join('?' * len(categories))})",
+                list(categories))
+    for cat, q in cur.fetchall():
+        if q:
+            texts[cat].append(_normalize_text(q))
+    conn.close()
+    return texts
+
+def similar_in(q_norm: str, existing_norms: List[str], threshold: float = 0.8) -> bool:
+    """Fuzzy test of question_similar_exists, against an in-memory list of normalized texts."""
+    import difflib
+    matcher = difflib.SequenceMatcher(None, "", q_norm)   # b side is cached across comparisons
+    for existing_norm in existing_norms:
+        if existing_norm == q_norm:
+            return True
+        matcher.set_seq1(existing_norm)
+        # real_quick_ratio/quick_ratio are upper bounds of ratio(), so cheap rejects come first
+        if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold \
+                and matcher.ratio() >= threshold:
+            return True
+    return False
+
+def max_question_id(db_path: str = DEFAULT_DB_PATH) -> int:
+    """Highest question id so far (0 if none); marks the point a duplicate snapshot was taken."""
+    init_questions_table(db_path)
+    conn = _connect(db_path)
+    row = conn.execute("SELECT MAX(id) FROM questions").fetchone()
+    conn.close()
+    return row[0] or 0
+
+def _insert_rows(conn, category, items, source):
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany("""
+        INSERT INTO questions (category, qtext, opt_a, opt_b, opt_c, opt_d, answer, source, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(category, it["question"], *(o.strip() for o in it["options"]), it["answer"], source, now)
+          for it in items])
+
+def insert_questions_batch(category: str, items: list, source: str = "manual",
+                           db_path: str = DEFAULT_DB_PATH) -> int:
+    """
+    Insert already validated and de-duplicated items ({"question", "options", "answer"})
+    in one transaction. Returns the number of rows written.
+    """
+    if not items:
+        return 0
+    init_questions_table(db_path)
+    conn = _connect(db_path)
+    try:
+        _insert_rows(conn, category, items, source)
+        conn.commit()
+    finally:
+        conn.close()
+    return len(items)
+
+def insert_questions_rechecked(category: str, items: list, after_id: int, source: str = "manual",
+                               threshold: float = 0.8, db_path: str = DEFAULT_DB_PATH):
+    """
+    insert_questions_batch for items de-duplicated against a snapshot taken at `after_id`.
+    Under the write lock, items similar to `category` questions added after that id (e.g. by
+    another generation job) are dropped, so concurrent writers cannot both insert the same
+    question. Returns (rows written, id the category is now checked up to): pass the latter
+    as `after_id` next time, so a run never re-compares against rows it wrote itself.
+    """
+    init_questions_table(db_path)
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")   # one writer at a time from here to commit
+        newer = [_normalize_text(q) for (q,) in conn.execute(
+            "SELECT qtext FROM questions WHERE category = ? AND id > ?", (category, after_id)) if q]
+        if newer:
+            items = [it for it in items if not similar_in(_normalize_text(it["question"]), newer, threshold)]
+        if items:
+            _insert_rows(conn, category, items, source)
+        checked_to = conn.execute("SELECT COALESCE(MAX(id), 0) FROM questions").fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+    return len(items), checked_to
+
 def insert_question_with_dup_check(category: str, qtext: str, opts: List[str], answer: str,
                                    source: str = "manual", threshold: float = 0.8,
                                    db_path: str = DEFAULT_DB_PATH) -> bool:
@@ -268,7 +483,7 @@ def insert_question_with_dup_check(category: str, qtext: str, opts: List[str], a
 
     init_questions_table(db_path)
 
-    conn = sqlite3.connect(db_path)
+    conn = _connect(db_path)
     cur = conn.cursor()
 
     cur.execute("SELECT id FROM questions WHERE qtext = ? AND category = ?", (qtext, category))
@@ -291,7 +506,7 @@ def insert_question_with_dup_check(category: str, qtext: str, opts: List[str], a
 
 def list_questions(category: str = None, limit: int = 20, db_path: str = DEFAULT_DB_PATH):
     init_questions_table(db_path)
-    conn = sqlite3.connect(db_path)
+    conn = _connect(db_path)
     cur = conn.cursor()
     if category:
         cur.execute("SELECT qtext, opt_a, opt_b, opt_c, opt_d, answer, source, created_at FROM questions WHERE category = ? ORDER BY id DESC LIMIT ?", (category, limit))
@@ -300,6 +515,89 @@ def list_questions(category: str = None, limit: int = 20, db_path: str = DEFAULT
     rows = cur.fetchall()
     conn.close()
     return rows
+
+def questions_page(category: str = None, limit: int = 20, before_id: int = None,
+                   db_path: str = DEFAULT_DB_PATH):
+    """
+    Keyset-paginated listing, newest first. Pass the returned cursor as `before_id`
+    to get the next page; the cursor is None after the last page.
+    Rows are (id, category, qtext, opt_a, opt_b, opt_c, opt_d, answer, source, created_at).
+    """
+    init_questions_table(db_path)
+    conn = _connect(db_path)
+    cur = conn.cursor()
+    sql = "SELECT id, category, qtext, opt_a, opt_b, opt_c, opt_d, answer, source, created_at FROM questions"
+    where, args = [], []
+    if category:
+        where.append("category = ?")
+        args.append(category)
+    if before_id is not None:
+        where.append("id < ?")
+        args.append(before_id)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC LIMIT ?"
+    cur.execute(sql, (*args, limit))
+    rows = cur.fetchall()
+    conn.close()
+    next_cursor = rows[-1][0] if len(rows) == limit else None
+    return rows, next_cursor
+
+def iter_questions(category: str = None, page_size: int = 500, db_path: str = DEFAULT_DB_PATH):
+    """Yield every question (newest first) using keyset pages, so memory stays constant."""
+    before_id = None
+    while True:
+        rows, before_id = questions_page(category, page_size, before_id, db_path)
+        yield from rows
+        if before_id is None:
+            break
+
+def _fts_query(text: str) -> str:
+    # quote every word so input like "B-tree" or "1NF/2NF" is not read as FTS5 syntax;
+    # a trailing * keeps prefix search ("normal*")
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+def search_questions(query: str, category: str = None, limit: int = 20, offset: int = 0,
+                     db_path: str = DEFAULT_DB_PATH):
+    """
+    Ranked full-text search over question text and options (best match first).
+    Returns rows of (id, category, qtext, opt_a, opt_b, opt_c, opt_d, answer);
+    use offset/limit to page through the results.
+    """
+    init_questions_table(db_path)
+    match = _fts_query(query)
+    if not match:
+        return []
+    conn = _connect(db_path)
+    cur = conn.cursor()
+    cols = "q.id, q.category, q.qtext, q.opt_a, q.opt_b, q.opt_c, q.opt_d, q.answer"
+    cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'questions_fts'")
+    if cur.fetchone():
+        sql = (f"SELECT {cols} FROM questions_fts f JOIN questions q ON q.id = f.rowid "
+               "WHERE questions_fts MATCH ?")
+        args = [match]
+        if category:
+            sql += " AND q.category = ?"
+            args.append(category)
+        sql += " ORDER BY f.rank LIMIT ? OFFSET ?"
+    else:
+        # no FTS5 in this SQLite build: unranked substring scan
+        sql = f"SELECT {cols} FROM questions q WHERE q.qtext LIKE ?"
+        args = [f"%{query.strip()}%"]
+        if category:
+            sql += " AND q.category = ?"
+            args.append(category)
+        sql += " ORDER BY q.id DESC LIMIT ? OFFSET ?"
+    cur.execute(sql, (*args, limit, offset))
+    rows = cur.fetchall()
+    conn.close()
+    return rows
 # --- end: question DB utilities ---
 
 if __name__ == "__main__":
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty folder so students.txt / scores.txt / app.db are throwaway copies."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
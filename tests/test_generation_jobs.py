@@ -0,0 +1,96 @@
+import json
+import time
+
+import generation_jobs
+
+
+QUESTIONS = ["What is the worst case of quicksort?", "Which index does SQLite use for a primary key?",
+             "How does a Python generator keep its state?"]
+
+
+def fake_llm(prompt):
+    return json.dumps([{"question": q, "options": ["a", "b", "c", "d"], "answer": "A"} for q in QUESTIONS])
+
+
+def test_live_lease_is_not_requeued(workdir):
+    job_id = generation_jobs.enqueue_job("DSA", 3)
+    job = generation_jobs.claim_next_job(owner="worker-1", lease_seconds=60)
+    assert job["id"] == job_id and job["owner"] == "worker-1"
+
+    assert generation_jobs.requeue_stale_jobs() == 0
+    assert generation_jobs.claim_next_job(owner="worker-2") is None
+    assert generation_jobs.get_job(job_id)["owner"] == "worker-1"
+
+
+def test_expired_lease_is_taken_over(workdir):
+    job_id = generation_jobs.enqueue_job("DSA", 3)
+    generation_jobs.claim_next_job(owner="dead-worker", lease_seconds=-1)
+
+    job = generation_jobs.claim_next_job(owner="worker-2")
+    assert job["id"] == job_id and job["owner"] == "worker-2"
+    # the old owner can no longer renew or finish it
+    assert not generation_jobs.renew_lease(job_id, "dead-worker")
+
+
+def test_workers_run_job_to_done(workdir):
+    job_id = generation_jobs.enqueue_job("DSA", 3)
+    stop = generation_jobs.start_workers(1, poll_interval=0.05, llm=fake_llm)
+    try:
+        deadline = time.time() + 5
+        while generation_jobs.get_job(job_id)["status"] in ("queued", "running") and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+    job = generation_jobs.get_job(job_id)
+    assert job["status"] == "done" and job["inserted"] == 3 and job["lease_until"] is None
+
+
+def test_job_with_failed_prompt_is_marked_failed(workdir):
+    calls = [0]
+
+    def flaky_llm(prompt):
+        calls[0] += 1
+        if calls[0] == 2:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+        return fake_llm(prompt)
+
+    job_id = generation_jobs.enqueue_job("DSA", 20)
+    job = generation_jobs.claim_next_job(owner="worker-1")
+    generation_jobs.run_job(job, llm=flaky_llm)
+    job = generation_jobs.get_job(job_id)
+    assert job["status"] == "failed" and "429" in job["error"]
+    assert job["inserted"] == 3   # the prompt that worked is still kept
+
+
+def test_worker_survives_db_errors(workdir, monkeypatch):
+    real_claim, real_renew = generation_jobs.claim_next_job, generation_jobs.renew_lease
+    calls = {"claim": 0, "renew": 0}
+
+    def flaky_claim(*args, **kwargs):
+        calls["claim"] += 1
+        if calls["claim"] == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real_claim(*args, **kwargs)
+
+    def flaky_renew(*args, **kwargs):
+        calls["renew"] += 1
+        if calls["renew"] == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real_renew(*args, **kwargs)
+
+    def slow_llm(prompt):
+        time.sleep(0.3)   # long enough for a few heartbeats
+        return fake_llm(prompt)
+
+    monkeypatch.setattr(generation_jobs, "claim_next_job", flaky_claim)
+    monkeypatch.setattr(generation_jobs, "renew_lease", flaky_renew)
+    job_id = generation_jobs.enqueue_job("DSA", 3)
+    stop = generation_jobs.start_workers(1, poll_interval=0.05, llm=slow_llm, lease_seconds=0.15)
+    try:
+        deadline = time.time() + 5
+        while generation_jobs.get_job(job_id)["status"] in ("queued", "running") and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+    assert generation_jobs.get_job(job_id)["status"] == "done"
+    assert calls["renew"] >= 2   # the heartbeat kept going after its first failure
@@ -0,0 +1,96 @@
+import random
+import threading
+
+import leaderboard
+import student_system
+
+
+def ranks(category="ALL"):
+    return {u: leaderboard.my_rank(u, category)[0] for u in ("a", "b", "c")}
+
+
+def test_ties_go_to_first_arrival(workdir):
+    for i, user in enumerate(("a", "b", "c")):
+        leaderboard.record_attempt(user, "DSA", 3, when=f"2026-01-01 10:00:0{i}")
+    assert ranks("DSA") == {"a": 1, "b": 2, "c": 3}
+
+    leaderboard.record_attempt("c", "DSA", 4, when="2026-01-01 11:00:00")
+    assert ranks("DSA") == {"c": 1, "a": 2, "b": 3}
+    # a lower or equal score later does not move anyone
+    assert not leaderboard.record_attempt("a", "DSA", 3, when="2026-01-01 12:00:00")
+    leaderboard.record_attempt("a", "DSA", 4, when="2026-01-01 12:00:00")
+    assert ranks("DSA") == {"c": 1, "a": 2, "b": 3}
+    assert leaderboard.my_rank("b", "DSA") == (3, 3, 3, 5)
+    assert [row[1] for row in leaderboard.top_k("DSA")] == ["c", "a", "b"]
+
+
+def test_overall_is_sum_of_category_bests(workdir):
+    leaderboard.record_attempt("a", "DSA", 3)
+    leaderboard.record_attempt("a", "DBMS", 4)
+    leaderboard.record_attempt("a", "DSA", 5)
+    leaderboard.record_attempt("b", "PYTHON", 5)
+    assert leaderboard.my_rank("a") == (1, 2, 9, 10)
+    assert leaderboard.top_k(k=1) == [(1, "a", 9, 10, leaderboard.top_k(k=1)[0][4])]
+    assert leaderboard.my_rank("nobody") is None
+
+
+def test_rebuild_from_scores_file(workdir):
+    (workdir / "scores.txt").write_text("b,DSA,4/5,01-01-2026 10:00:05\n"
+                                        "a,DSA,4/5,01-01-2026 10:00:01\n"
+                                        "bad line\n"
+                                        "c,DSA,2/5,01-01-2026 09:00:00\n")
+    leaderboard.init_leaderboard()   # first use fills app.db from scores.txt
+    assert ranks("DSA") == {"a": 1, "b": 2, "c": 3}
+
+    with open(workdir / "scores.txt", "a") as f:
+        f.write("c,DSA,5/5,01-01-2026 08:00:00\n")
+    assert leaderboard.rebuild_from_scores() == 4
+    assert ranks("DSA") == {"c": 1, "a": 2, "b": 3}
+
+
+def test_my_rank_matches_sorted_order(workdir):
+    rng = random.Random(5)
+    users = [f"u{i}" for i in range(40)]
+    attempts = [(rng.choice(users), "DSA", rng.randrange(6), 5, f"2026-01-01 10:{i // 60:02d}:{i % 60:02d}")
+                for i in range(400)]
+    leaderboard.record_attempts(attempts)
+
+    best = {}
+    for user, _, score, _, when in attempts:
+        if user not in best or score > best[user][0]:
+            best[user] = (score, when)
+    expected = sorted(best, key=lambda u: (-best[u][0], best[u][1]))
+    for rank, user in enumerate(expected, 1):
+        assert leaderboard.my_rank(user, "DSA")[:2] == (rank, len(expected))
+    assert [row[1] for row in leaderboard.top_k("DSA", k=len(expected))] == expected
+
+
+def test_concurrent_writers_keep_counts_consistent(workdir):
+    leaderboard.init_leaderboard()
+    rng = random.Random(9)
+    batches = [[(f"u{rng.randrange(5)}", "DSA", rng.randrange(6), 5, None) for _ in range(40)] for _ in range(4)]
+
+    def write(batch):
+        for attempt in batch:
+            leaderboard.record_attempt(*attempt[:4])
+
+    threads = [threading.Thread(target=write, args=(batch,)) for batch in batches]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    conn = student_system._connect("app.db")
+    for category in ("DSA", leaderboard.OVERALL):
+        held = dict(conn.execute("SELECT best_score, COUNT(*) FROM leaderboard WHERE category = ? "
+                                 "GROUP BY best_score", (category,)).fetchall())
+        counted = {score: n for score, n in conn.execute(
+            "SELECT best_score, n FROM leaderboard_counts WHERE category = ?", (category,)) if n}
+        assert counted == held
+    conn.close()
+    best = {}
+    for batch in batches:
+        for user, _, score, _, _ in batch:
+            best[user] = max(best.get(user, 0), score)
+    assert sorted(row[2] for row in leaderboard.top_k("DSA")) == sorted(best.values())
+    assert sorted(leaderboard.my_rank(u, "DSA")[0] for u in best) == list(range(1, len(best) + 1))
@@ -0,0 +1,27 @@
+import load_simulator
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))   # 1..100
+    assert load_simulator.percentile(values, 50) == 50
+    assert load_simulator.percentile(values, 95) == 95
+    assert load_simulator.percentile(values, 99) == 99
+    assert load_simulator.percentile(values, 100) == 100
+    assert load_simulator.percentile([7, 8, 9, 10], 50) == 8
+    assert load_simulator.percentile([7, 8, 9, 10], 0) == 7
+    assert load_simulator.percentile([], 50) == 0.0
+
+
+def test_simulation_drives_the_menu_quiz_path(workdir):
+    first, second = workdir / "a", workdir / "b"
+    first.mkdir()
+    second.mkdir()
+    report = load_simulator.simulate(students=20, seed=3, gen_batches=1, gen_size=5, folder=str(first))
+    load_simulator.simulate(students=20, seed=3, gen_batches=1, gen_size=5, folder=str(second))
+
+    assert report["flows"]["quiz_attempt"]["count"] == 20
+    assert not list(first.glob("questions_*.txt"))   # synthetic banks stay out of the data folder
+    scores = [(first / "scores.txt").read_text().splitlines(), (second / "scores.txt").read_text().splitlines()]
+    assert len(scores[0]) == 20
+    # same seed, same attempts (only the timestamps differ)
+    assert [line.rsplit(",", 1)[0] for line in scores[0]] == [line.rsplit(",", 1)[0] for line in scores[1]]
@@ -0,0 +1,62 @@
+import quiz
+import student_system
+
+
+def write_scores(n):
+    with open("scores.txt", "w") as f:
+        for i in range(n):
+            f.write(f"user{i % 3},DSA,{i % 6}/5,01-01-2026 10:00:{i:02d}\n")
+
+
+def test_scores_pages_cover_every_row_once(workdir):
+    write_scores(10)
+    seen, cursor, pages = [], 0, 0
+    while cursor is not None:
+        rows, cursor = quiz.scores_page(cursor, 5)   # 10 rows -> two full pages
+        seen.extend(rows)
+        pages += 1
+    assert [r[3][-2:] for r in seen] == [f"{i:02d}" for i in range(10)]
+    assert pages == 3   # the last full page is followed by one empty read
+    assert list(quiz.iter_scores(page_size=3)) == seen
+
+
+def test_scores_page_filters_by_user(workdir):
+    write_scores(10)
+    rows, _ = quiz.scores_page(0, 100, username="user1")
+    assert [r[0] for r in rows] == ["user1"] * 3
+    assert len(list(quiz.iter_scores("user2", page_size=1))) == 3
+
+
+def test_missing_scores_file(workdir):
+    assert quiz.scores_page() == ([], None)
+    assert list(quiz.iter_scores()) == []
+
+
+def test_users_pages_skip_short_lines(workdir):
+    with open("students.txt", "w") as f:
+        for i in range(5):
+            f.write(",".join([f"Name {i}", f"u{i}", "pw"] + ["x"] * 8 + ["user"]) + "\n")
+            f.write("broken,line\n")
+    first, cursor = student_system.users_page(0, 3)
+    rest, end = student_system.users_page(cursor, 3)
+    assert [u for u, _ in first + rest] == ["u0", "u1", "u2", "u3", "u4"]
+    assert end is None
+    assert [u for u, _ in student_system.iter_users(page_size=2)] == ["u0", "u1", "u2", "u3", "u4"]
+
+
+def test_questions_keyset_pages(workdir):
+    student_system.insert_questions_batch("DSA", [
+        {"question": f"q{i}", "options": ["a", "b", "c", "d"], "answer": "A"} for i in range(7)])
+    student_system.insert_questions_batch("DBMS", [
+        {"question": "other", "options": ["a", "b", "c", "d"], "answer": "A"}])
+
+    rows, cursor = student_system.questions_page("DSA", 3)
+    assert [r[0] for r in rows] == [7, 6, 5] and cursor == 5
+    rows, cursor = student_system.questions_page("DSA", 3, cursor)
+    assert [r[0] for r in rows] == [4, 3, 2]
+    rows, cursor = student_system.questions_page("DSA", 3, cursor)
+    assert [r[0] for r in rows] == [1] and cursor is None
+
+    assert [r[0] for r in student_system.iter_questions(page_size=4)] == [8, 7, 6, 5, 4, 3, 2, 1]
+    # a page that ends exactly on the last row needs one empty follow-up, not an error
+    assert [r[0] for r in student_system.iter_questions(page_size=8)] == [8, 7, 6, 5, 4, 3, 2, 1]
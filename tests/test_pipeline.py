@@ -0,0 +1,109 @@
+import json
+import hashlib
+import sqlite3
+import threading
+
+import pytest
+
+import student_system
+import ai_questions_gemini_db as gen
+
+
+def distinct_llm(fail_calls=()):
+    """Replies with unrelated questions; raises a 429-style error on the given call numbers."""
+    calls = [0]
+    lock = threading.Lock()
+
+    def llm(prompt):
+        with lock:
+            calls[0] += 1
+            call = calls[0]
+        if call in fail_calls:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+        n = int(prompt.split("exactly ")[1].split()[0])
+        return json.dumps([{"question": hashlib.sha1(f"{call}-{i}".encode()).hexdigest(),
+                            "options": ["a", "b", "c", "d"], "answer": "A"} for i in range(n)])
+
+    return llm
+
+
+def run(requested, llm, **opts):
+    opts.setdefault("generate_workers", 1)
+    return gen.run_generation_pipeline(requested, llm=llm, db_path="app.db", **opts)["counts"]
+
+
+def test_failed_prompt_is_reported(workdir):
+    counts = run({"DSA": 20}, distinct_llm(fail_calls={2}), batch_size=10)
+    assert counts["parsed"] == 10
+    assert counts["errors"] == ["generate: 429 RESOURCE_EXHAUSTED"]
+
+
+def test_all_prompts_failing_raises(workdir):
+    with pytest.raises(RuntimeError, match="429"):
+        run({"DSA": 20}, distinct_llm(fail_calls={1, 2}), batch_size=10)
+
+
+def test_failed_write_is_counted(workdir, monkeypatch):
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(student_system, "insert_questions_rechecked", locked)
+    counts = run({"DSA": 5}, distinct_llm())
+    assert counts["inserted"] == 0
+    assert counts["failed"] == 5 and counts["by_category"]["DSA"]["failed"] == 5
+    assert counts["errors"] == ["write: database is locked"]
+
+
+def test_duplicate_added_after_snapshot_is_skipped_at_write(workdir, monkeypatch):
+    question = {"question": "What is the worst case of quicksort?", "options": ["a", "b", "c", "d"], "answer": "A"}
+    student_system.insert_questions_batch("DSA", [question])
+    # another job wrote it after this one took its snapshot
+    monkeypatch.setattr(student_system, "max_question_id", lambda db_path: 0)
+    monkeypatch.setattr(student_system, "load_normalized_questions_by_category",
+                        lambda categories, db_path: {c: [] for c in categories})
+
+    counts = run({"DSA": 1}, lambda prompt: json.dumps([question]))
+    assert counts["inserted"] == 0 and counts["skipped"] == 1
+    assert len(student_system.list_questions("DSA")) == 1
+
+
+def test_recheck_skips_rows_this_run_already_checked(workdir):
+    question = {"question": "What is the worst case of quicksort?", "options": ["a", "b", "c", "d"], "answer": "A"}
+    written, checked_to = student_system.insert_questions_rechecked("DSA", [question], 0)
+    assert (written, checked_to) == (1, 1)
+    # from the returned id on, only rows written by others are compared
+    assert student_system.insert_questions_rechecked("DSA", [question], checked_to) == (1, 2)
+    assert student_system.insert_questions_rechecked("DSA", [question], 0) == (0, 2)
+
+
+def test_failing_progress_callback_keeps_counts(workdir):
+    def progress(done, total):
+        raise sqlite3.OperationalError("database is locked")
+
+    counts = run({"DSA": 20}, distinct_llm(), batch_size=10, write_batch=5, progress=progress)
+    assert counts["inserted"] == 20 and counts["failed"] == 0 and counts["errors"] == []
+    assert len(student_system.list_questions("DSA", limit=100)) == 20
+
+
+def test_plan_prompts_balances_categories():
+    plan = gen.plan_prompts({"DSA": 5, "DBMS": 5, "PYTHON": 5}, batch_size=10)
+    assert plan == [{"DSA": 4, "DBMS": 3, "PYTHON": 3}, {"DSA": 1, "DBMS": 2, "PYTHON": 2}]
+    assert gen.plan_prompts({"DSA": 25}, batch_size=10) == [{"DSA": 10}, {"DSA": 10}, {"DSA": 5}]
+    assert gen.plan_prompts({"DSA": 0}) == []
+
+
+def test_multi_category_items_are_routed_by_tag(workdir):
+    def llm(prompt):
+        items = [{"question": hashlib.sha1(f"{cat}-{i}".encode()).hexdigest(), "options": ["a", "b", "c", "d"],
+                  "answer": "B", "category": cat} for cat in ("DSA", "DBMS") for i in range(2)]
+        items.append(dict(items[0], category="HISTORY"))
+        items.append({k: v for k, v in items[1].items() if k != "category"})
+        return json.dumps(items)
+
+    counts = gen.generate_multi_category_to_db(["dsa", "DBMS"], 2, sleep_after=0, llm=llm)
+    by_cat = counts["by_category"]
+    assert by_cat["DSA"]["inserted"] == 2 and by_cat["DBMS"]["inserted"] == 2
+    assert by_cat[gen.UNTAGGED]["invalid"] == 2
+    for key in ("inserted", "skipped", "invalid", "failed"):
+        assert sum(st[key] for st in by_cat.values()) == counts[key]
+    assert len(student_system.list_questions("DBMS")) == 2
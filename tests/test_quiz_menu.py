@@ -0,0 +1,19 @@
+import builtins
+
+import quiz
+import student_system
+
+
+def test_generate_rejects_category_list_without_names(workdir, monkeypatch, capsys):
+    monkeypatch.setattr(student_system, "users", {})
+    student_system.create_user(["Admin", "root", "pw", "LNCTS", "0", "B.Tech", "root@example.com", "0",
+                                "01-01-2000", "Male", "", "admin"])
+    monkeypatch.setattr(student_system, "logged", True)
+    monkeypatch.setattr(student_system, "logged_user", "root")
+    answers = iter(["3", " , ,", "8"])   # Generate AI Questions, only commas, Back
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers))
+
+    quiz.admin_panel()
+    out = capsys.readouterr().out
+    assert "No category entered. Cancelled." in out
+    assert "Failed to generate" not in out
@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+import quiz_server
+import student_system
+
+
+def user(username, password, role="user"):
+    return [username.title(), username, password, "LNCTS", "0157CS1", "B.Tech", f"{username}@example.com",
+            "9000000000", "01-01-2005", "Female", "", role]
+
+
+@pytest.fixture
+def bank(workdir, monkeypatch):
+    monkeypatch.setattr(student_system, "users", {})
+    monkeypatch.setattr(student_system, "_users_stamp", None)
+    for name in ("ann", "mallory", "bob"):
+        student_system.create_user(user(name, f"{name}-pw"))
+    blocks = [[f"Q{i}?", "A. a", "B. b", "C. c", "D. d", f"ANSWER: {'ABCD'[i % 4]}"] for i in range(20)]
+    monkeypatch.setattr(quiz_server, "bank", {"DSA": blocks, "DBMS": []})
+    return blocks
+
+
+def scores_lines():
+    with open("scores.txt") as f:
+        return [line.strip() for line in f]
+
+
+def start(name, category="DSA", seed=None):
+    return quiz_server.start_quiz(quiz_server.login(name, f"{name}-pw"), category, 5, seed=seed)
+
+
+def test_submit_grades_only_issued_questions(bank):
+    started = start("ann", seed=1)
+    issued = [i for i, _ in started["questions"]]
+    answers = [(i, "ABCD"[i % 4]) for i in issued[:3]]   # 3 right, 2 unanswered
+    assert quiz_server.submit_answers(started["session"], answers) == (3, 5)
+    assert scores_lines()[0].startswith("ann,DSA,3/5,")
+
+
+def test_submit_rejects_unissued_repeated_and_forged(bank):
+    started = start("mallory", seed=2)
+    issued = [i for i, _ in started["questions"]]
+    other = next(i for i in range(20) if i not in issued)
+    with pytest.raises(ValueError):
+        quiz_server.submit_answers(started["session"], [(other, "A")])
+    with pytest.raises(ValueError):
+        quiz_server.submit_answers(started["session"], [(issued[0], "A")] * 50)
+    forged = started["session"].replace("mallory", "alice")
+    with pytest.raises(ValueError):
+        quiz_server.submit_answers(forged, [])
+
+
+def test_same_session_recorded_once(bank):
+    started = start("bob", seed=3)
+    quiz_server.submit_answers(started["session"], [])
+    quiz_server.submit_answers(started["session"], [])
+    assert len(scores_lines()) == 1
+
+
+def test_quiz_needs_a_verified_login(bank):
+    with pytest.raises(ValueError):
+        quiz_server.login("ann", "wrong")
+    with pytest.raises(ValueError):
+        quiz_server.login("nobody", "")
+    token = quiz_server.login("ann", "ann-pw")
+    with pytest.raises(ValueError):
+        quiz_server.start_quiz(token.replace("ann", "bob"), "DSA")
+    with pytest.raises(ValueError):
+        quiz_server.start_quiz(start("ann")["session"], "DSA")   # a quiz session is not a login
+
+
+def test_unknown_or_empty_category_is_rejected(bank):
+    token = quiz_server.login("ann", "ann-pw")
+    for category in ("DBMS", "HISTORY"):
+        with pytest.raises(ValueError):
+            quiz_server.start_quiz(token, category)
+    assert not os.path.exists("scores.txt")
+
+
+def test_register_cannot_replace_an_account(bank):
+    quiz_server.register_user(user("eve", "eve-pw", "admin"))
+    with pytest.raises(ValueError):
+        quiz_server.register_user(user("eve", "pwned"))
+    student_system.users.clear()
+    student_system.load_users()
+    assert student_system.users["eve"]["role"] == "admin"
+    assert student_system.login_user("eve", "eve-pw") and not student_system.login_user("eve", "pwned")
+
+
+def test_server_reports_registration_result_to_worker(workdir, monkeypatch):
+    monkeypatch.setattr(student_system, "users", {})
+    monkeypatch.setattr(student_system, "_users_stamp", None)
+    with open("questions_dsa.txt", "w") as f:
+        f.write("Q1. Sample?\nA. a\nB. b\nC. c\nD. d\nANSWER: A\n\n")
+    server = quiz_server.start_server(1, {"DSA": "questions_dsa.txt"})
+    try:
+        pool = server["pool"]
+        pool.apply(quiz_server.handle_request, (("register", user("zoe", "zoe-pw")),))
+        with pytest.raises(ValueError):
+            pool.apply(quiz_server.handle_request, (("register", user("zoe", "other")),))
+        token = pool.apply(quiz_server.handle_request, (("login", "zoe", "zoe-pw"),))
+        started = pool.apply(quiz_server.handle_request, (("start", token, "DSA", 5, 1),))
+        assert pool.apply(quiz_server.handle_request, (("submit", started["session"], [(0, "A")]),)) == (1, 1)
+    finally:
+        quiz_server.stop_server(server)
+    assert scores_lines()[0].startswith("zoe,DSA,1/1,")
@@ -0,0 +1,42 @@
+import student_system
+
+
+def add(category, qtext):
+    assert student_system.insert_question_with_dup_check(category, qtext, ["a", "b", "c", "d"], "A")
+
+
+def ids(rows):
+    return [r[0] for r in rows]
+
+
+def test_search_finds_hyphenated_and_prefix_terms(workdir):
+    add("DSA", "What is the height of a B-tree of order m?")
+    add("DBMS", "Which normal form removes transitive dependency?")
+    assert ids(student_system.search_questions("B-tree")) == [1]
+    assert ids(student_system.search_questions("normal*", "DBMS")) == [2]
+    assert student_system.search_questions("normal*", "DSA") == []
+
+
+def test_fts_follows_updates_and_deletes(workdir):
+    add("DSA", "Explain heap sort in place")
+    conn = student_system._connect()
+    conn.execute("UPDATE questions SET qtext = 'Explain merge sort stability' WHERE id = 1")
+    conn.commit()
+    assert student_system.search_questions("heap") == []
+    assert ids(student_system.search_questions("merge")) == [1]
+
+    conn.execute("DELETE FROM questions WHERE id = 1")
+    conn.commit()
+    conn.close()
+    assert student_system.search_questions("merge") == []
+
+
+def test_search_pages_with_offset(workdir):
+    # near-identical texts, so skip the fuzzy duplicate check
+    student_system.insert_questions_batch("DSA", [
+        {"question": f"Describe a {t} used for scheduling", "options": ["a", "b", "c", "d"], "answer": "A"}
+        for t in ("stack", "queue", "graph", "trie", "heap")])
+    first = ids(student_system.search_questions("scheduling", limit=3))
+    second = ids(student_system.search_questions("scheduling", limit=3, offset=3))
+    assert len(first) == 3 and len(second) == 2
+    assert sorted(first + second) == [1, 2, 3, 4, 5]
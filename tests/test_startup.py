@@ -0,0 +1,24 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+import ai_questions_gemini_db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_quiz_loads_no_lazy_modules():
+    code = ("import sys, quiz, bench_startup\n"
+            "print(','.join(m for m in bench_startup.LAZY_MODULES if m in sys.modules))")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == ""
+
+
+def test_missing_sdk_is_reported_by_name(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setitem(sys.modules, "google.genai", None)   # makes `from google import genai` fail
+    with pytest.raises(RuntimeError, match="google-genai is not installed"):
+        ai_questions_gemini_db.call_gemini("hello")